@@ -1,7 +1,10 @@
 # Credit to AlcatrazEscapee and EERussianGuy, the devs of TerraFirmaCraft!
 # Licensed under EUPL v1.2
 
+import itertools
+import re
 from enum import Enum, auto
+from functools import lru_cache
 from typing import Dict, List, Set, NamedTuple, Sequence, Optional, Tuple, Any, Union, Literal, get_args
 from mcresources import ResourceManager, utils, loot_tables, RecipeContext, ItemContext, BlockContext
 from mcresources.type_definitions import ResourceIdentifier, Json, JsonObject, VerticalAnchor
@@ -275,6 +278,7 @@ ROCKS: Dict[str, Rock] = {
     'gneiss': Rock('metamorphic', 'green'),
     'marble': Rock('metamorphic', 'yellow')
 }
+ROCKS_BY_CATEGORY: Dict[str, Tuple[str, ...]] = {category: tuple(rock for rock, data in ROCKS.items() if data.category == category) for category in ROCK_CATEGORIES}
 METALS: Dict[str, Metal] = {
     'bismuth': Metal(1, {'part'}, 0.14, 270, None),
     'bismuth_bronze': Metal(2, {'part', 'tool', 'armor', 'utility'}, 0.35, 985, None),
@@ -1085,6 +1089,8 @@ ALLOYS: Dict[str, Tuple[Tuple[str, float, float], ...]] = {
     'weak_red_steel': (('black_steel', 0.5, 0.55), ('steel', 0.2, 0.25), ('brass', 0.1, 0.15), ('rose_gold', 0.1, 0.15))
 }
 
+RESOURCE_NAMESPACE = re.compile(r'#?([a-z0-9_.-]+):[a-z0-9_./-]')
+
 # This is here because it's used all over, and it's easier to import with all constants
 def lang(key: str, *args) -> str:
     return ((key % args) if len(args) > 0 else key).replace('_', ' ').replace('/', ' ').title()
@@ -2138,6 +2144,44 @@ def disable_recipe(rm: ResourceManager, name_parts: ResourceIdentifier):
     rm.recipe(name_parts, None, {}, conditions='forge:false')
 
 
+def disable_recipes(rm: ResourceManager, name_parts: ResourceIdentifier, recipes: Sequence[ResourceIdentifier]):
+    # Disables all recipes through a single filter file under disabled_recipes/, which is applied by DisabledRecipes, rather than one override file per recipe
+    # Recipe ids without a namespace are in minecraft, as with ResourceLocation
+    rm.data(('disabled_recipes', name_parts), {'recipes': sorted({utils.resource_location('minecraft', recipe).join() for recipe in recipes})})
+
+
+def mod_loaded(mod_id: str) -> Json:
+    return {'type': 'forge:mod_loaded', 'modid': mod_id}
+
+
+def required_mods(data: Json, optional_mods: Dict[str, str]) -> List[str]:
+    # The optional mods (a map of namespace -> mod id) whose namespaces are referenced anywhere in data, either by id, tag or stack string
+    mods = set()
+    if isinstance(data, dict):
+        for key, value in data.items():
+            mods.update(required_mods(key, optional_mods), required_mods(value, optional_mods))
+    elif isinstance(data, (list, tuple)):
+        for value in data:
+            mods.update(required_mods(value, optional_mods))
+    elif isinstance(data, str):
+        mods.update(optional_mods[namespace] for namespace in RESOURCE_NAMESPACE.findall(data) if namespace in optional_mods)
+    return sorted(mods)
+
+
+def mod_conditions(data: Json, optional_mods: Dict[str, str]) -> Optional[List[Json]]:
+    return [mod_loaded(mod) for mod in required_mods(data, optional_mods)] or None
+
+
+def split_by_mod(table: Dict[str, str], optional_mods: Dict[str, str]) -> Dict[Optional[str], Dict[str, str]]:
+    # Splits a table by the optional mod each entry depends on (None, for no optional mod), so each part can be emitted with its own conditions
+    split = {}
+    for key, value in table.items():
+        mods = required_mods((key, value), optional_mods)
+        assert len(mods) <= 1, 'Entry depends on multiple optional mods: %s -> %s' % (key, value)
+        split.setdefault(mods[0] if mods else None, {})[key] = value
+    return split
+
+
 def collapse_recipe(rm: ResourceManager, name_parts: utils.ResourceIdentifier, ingredient, result: Optional[utils.Json] = None, copy_input: Optional[bool] = None):
     assert result is not None or copy_input
     rm.recipe(('collapse', name_parts), 'tfc:collapse', {
@@ -2376,6 +2420,17 @@ def blast_furnace_recipe(rm: ResourceManager, name_parts: utils.ResourceIdentifi
     })
 
 
+def poisoning_recipe(rm: ResourceManager, name_parts: utils.ResourceIdentifier, poison: Json, fluids: Dict[str, str], amount_per_poison: int, max_poisons: int, min_amount: int = None, conditions: Json = None) -> RecipeContext:
+    # A single crafting recipe for every fluid -> poisoned fluid pair, with the output amount scaling with the number of poisons used
+    return rm.recipe(name_parts, 'poisoned_drinks:poisoning', {
+        'poison': utils.ingredient(poison),
+        'fluids': fluids,
+        'min_amount': min_amount,
+        'amount_per_poison': amount_per_poison,
+        'max_poisons': max_poisons
+    }, conditions=conditions)
+
+
 def barrel_sealed_recipe(rm: ResourceManager, name_parts: utils.ResourceIdentifier, translation: str, duration: int, input_item: Optional[Json] = None, input_fluid: Optional[Json] = None, output_item: Optional[Json] = None, output_fluid: Optional[Json] = None, on_seal: Optional[Json] = None, on_unseal: Optional[Json] = None, sound: Optional[str] = None):
     rm.recipe(('barrel', name_parts), 'tfc:barrel_sealed', {
         'input_item': item_stack_ingredient(input_item) if input_item is not None else None,
@@ -2401,6 +2456,16 @@ def barrel_instant_recipe(rm: ResourceManager, name_parts: utils.ResourceIdentif
     })
 
 
+def barrel_poisoning_recipe(rm: ResourceManager, name_parts: utils.ResourceIdentifier, input_item: Json, input_fluid: Json, fluids: Dict[str, str], sound: Optional[str] = None, conditions: Json = None):
+    # An instant barrel recipe, keyed on a fluid tag, which replaces any fluid in the fluids table with its poisoned fluid
+    rm.recipe(('barrel', name_parts), 'poisoned_drinks:barrel_poisoning', {
+        'input_item': item_stack_ingredient(input_item),
+        'input_fluid': fluid_stack_ingredient(input_fluid),
+        'fluids': fluids,
+        'sound': sound
+    }, conditions=conditions)
+
+
 def barrel_instant_fluid_recipe(rm: ResourceManager, name_parts: utils.ResourceIdentifier, primary_fluid: Optional[Json] = None, added_fluid: Optional[Json] = None, output_fluid: Optional[Json] = None, sound: Optional[str] = None):
     rm.recipe(('barrel', name_parts), 'tfc:barrel_instant_fluid', {
         'primary_fluid': fluid_stack_ingredient(primary_fluid) if primary_fluid is not None else None,
@@ -2597,7 +2662,9 @@ def item_model_property(rm: ResourceManager, name_parts: utils.ResourceIdentifie
 
 
 def water_based_fluid(rm: ResourceManager, name: str):
-    rm.blockstate(('fluid', name)).with_block_model({'particle': 'minecraft:block/water_still'}, parent=None).with_tag('all_fluids')
+    # Every water based fluid shares one block model, which is only used for its particle texture
+    rm.block_model('water_based_fluid', {'particle': 'minecraft:block/water_still'}, parent=None)
+    rm.blockstate(('fluid', name), model='poisoned_drinks:block/water_based_fluid').with_tag('all_fluids')
     rm.fluid_tag(name, 'poisoned_drinks:%s' % name, 'poisoned_drinks:flowing_%s' % name)
 
     item = rm.custom_item_model(('bucket', name), 'forge:fluid_container', {
@@ -2956,18 +3023,7 @@ def configured_noise_plant_feature(rm: ResourceManager, name_parts: ResourceIden
     if water:
         placed_decorators.append(decorate_shallow(water_depth, min_water_depth))
 
-    rm.configured_feature(singular_feature, 'minecraft:simple_block', {
-        'to_place': {
-            'seed': 2345,
-            'noise': normal_noise(-3, 1.0),
-            'scale': 1.0,
-            'states': [utils.block_state(config.block)],
-            'variety': [1, 1],
-            'slow_noise': normal_noise(-10, 1.0),
-            'slow_scale': 1.0,
-            'type': 'minecraft:dual_noise_provider'
-        }
-    })
+    rm.configured_feature(singular_feature, 'minecraft:simple_block', {'to_place': noise_plant_state_provider(config.block)})
     rm.configured_feature(patch_feature, 'minecraft:random_patch', {
         'tries': config.tries,
         'xz_spread': config.xz_spread,
@@ -2978,6 +3034,19 @@ def configured_noise_plant_feature(rm: ResourceManager, name_parts: ResourceIden
     rm.placed_feature(singular_feature, singular_feature, *placed_decorators)
 
 
+def noise_plant_state_provider(block: str) -> Dict[str, Any]:
+    return {
+        'seed': 2345,
+        'noise': normal_noise(-3, 1.0),
+        'scale': 1.0,
+        'states': [utils.block_state(block)],
+        'variety': [1, 1],
+        'slow_noise': normal_noise(-10, 1.0),
+        'slow_scale': 1.0,
+        'type': 'minecraft:dual_noise_provider'
+    }
+
+
 def normal_noise(first_octave: int, amplitude: float):
     return {'firstOctave': first_octave, 'amplitudes': [amplitude]}
 
@@ -3028,12 +3097,89 @@ def mineral_ore_blocks(vein: Vein, rock: str) -> List[Dict[str, Any]]:
     return ore_blocks
 
 
+@lru_cache(maxsize=None)
+def vein_rocks(rocks: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(expand_rocks(list(rocks)))
+
+
+class IntervalNode(NamedTuple):
+    center: int
+    by_min: Tuple[Tuple[int, int, str], ...]  # (min_y, max_y, vein) of intervals containing center, by ascending min_y
+    by_max: Tuple[Tuple[int, int, str], ...]  # The same intervals, by descending max_y
+    left: Optional['IntervalNode']  # Intervals entirely below center
+    right: Optional['IntervalNode']  # Intervals entirely above center
+
+
+def interval_tree(intervals: Sequence[Tuple[int, int, str]]) -> Optional[IntervalNode]:
+    if not intervals:
+        return None
+    ends = sorted(y for interval in intervals for y in interval[:2])
+    center = ends[len(ends) // 2]
+    overlapping = [i for i in intervals if i[0] <= center <= i[1]]
+    return IntervalNode(
+        center,
+        tuple(sorted(overlapping)),
+        tuple(sorted(overlapping, key=lambda i: (-i[1], i[0], i[2]))),
+        interval_tree([i for i in intervals if i[1] < center]),
+        interval_tree([i for i in intervals if i[0] > center])
+    )
+
+
+def query_interval_tree(node: Optional[IntervalNode], y: int) -> List[str]:
+    found = []
+    while node is not None:
+        if y < node.center:
+            found += [vein for min_y, _, vein in itertools.takewhile(lambda i: i[0] <= y, node.by_min)]
+            node = node.left
+        elif y > node.center:
+            found += [vein for _, max_y, vein in itertools.takewhile(lambda i: i[1] >= y, node.by_max)]
+            node = node.right
+        else:
+            found += [vein for _, _, vein in node.by_min]
+            node = None
+    return found
+
+
+@lru_cache(maxsize=None)
+def vein_index() -> Dict[str, Optional[IntervalNode]]:
+    # Rock -> interval tree over the y ranges of every vein which can spawn in that rock
+    intervals: Dict[str, List[Tuple[int, int, str]]] = {rock: [] for rock in ROCKS}
+    for name, vein in ORE_VEINS.items():
+        for rock in vein_rocks(vein.rocks):
+            intervals[rock].append((vein.min_y, vein.max_y, name))
+    return {rock: interval_tree(rock_intervals) for rock, rock_intervals in intervals.items()}
+
+
+def veins_at(rock: str, y: int) -> List[str]:
+    # The names of every vein which can spawn in a rock at a y level
+    return sorted(query_interval_tree(vein_index()[rock], y))
+
+
 def vein_density(density: int) -> float:
     assert 0 <= density <= 100, 'Invalid density: %s' % str(density)
     return round(density * 0.01, 2)
 
 
 # Tree Helper Functions
+# Parts of tree configs which only depend on the tree (or are constant) are built once and cached.
+# These cached structures are shared between every config that uses them, so they must not be mutated.
+
+class ForestEntry(NamedTuple):
+    min_rain: float
+    max_rain: float
+    min_temp: float
+    max_temp: float
+    old_growth: bool
+    old_growth_chance: int = None
+    spoiler_chance: int = None
+    krum: bool = False
+    floating: bool = None
+
+
+def forest_configs(rm: ResourceManager, entries: Dict[str, ForestEntry]):
+    for tree, entry in entries.items():
+        forest_config(rm, entry.min_rain, entry.max_rain, entry.min_temp, entry.max_temp, tree, entry.old_growth, entry.old_growth_chance, entry.spoiler_chance, entry.krum, entry.floating)
+
 
 def forest_config(rm: ResourceManager, min_rain: float, max_rain: float, min_temp: float, max_temp: float, tree: str, old_growth: bool, old_growth_chance: int = None, spoiler_chance: int = None, krum: bool = False, floating: bool = None):
     cfg = {
@@ -3043,18 +3189,29 @@ def forest_config(rm: ResourceManager, min_rain: float, max_rain: float, min_tem
             'min_rainfall': min_rain,
             'max_rainfall': max_rain
         },
-        'groundcover': [{'block': 'tfc:wood/twig/%s' % tree}],
-        'normal_tree': 'tfc:tree/%s' % tree,
-        'dead_tree': 'tfc:tree/%s_dead' % tree,
+        **forest_tree_template(tree),
         'krummholz': None if not krum else 'tfc:tree/%s_krummholz' % tree,
         'old_growth_chance': old_growth_chance,
         'spoiler_old_growth_chance': spoiler_chance,
         'floating': floating,
+        'old_growth_tree': 'tfc:tree/%s_large' % tree if old_growth else None
     }
+    rm.configured_feature('tree/%s_entry' % tree, 'tfc:forest_entry', cfg)
+    rm.configured_feature('tree/dead_%s_entry' % tree, 'tfc:forest_entry', {**cfg, 'dead_chance': 1, 'fallen_tree_chance': 8, 'floating': None})
+
+
+@lru_cache(maxsize=None)
+def forest_tree_template(tree: str) -> JsonObject:
+    groundcover = [{'block': 'tfc:wood/twig/%s' % tree}]
     if tree != 'palm':
-        cfg['groundcover'] += [{'block': 'tfc:wood/fallen_leaves/%s' % tree}]
+        groundcover.append({'block': 'tfc:wood/fallen_leaves/%s' % tree})
     if tree == 'pine':
-        cfg['groundcover'] += [{'block': 'tfc:groundcover/pinecone'}]
+        groundcover.append({'block': 'tfc:groundcover/pinecone'})
+    cfg = {
+        'groundcover': tuple(groundcover),
+        'normal_tree': 'tfc:tree/%s' % tree,
+        'dead_tree': 'tfc:tree/%s_dead' % tree,
+    }
     if tree not in ('acacia', 'willow'):
         cfg['fallen_log'] = 'tfc:wood/log/%s' % tree
         cfg['fallen_leaves'] = 'tfc:wood/fallen_leaves/%s' % tree
@@ -3063,22 +3220,14 @@ def forest_config(rm: ResourceManager, min_rain: float, max_rain: float, min_tem
     if tree not in ('palm', 'rosewood', 'sycamore'):
         cfg['bush_log'] = utils.block_state('tfc:wood/wood/%s[branch_direction=down,axis=y]' % tree)
         cfg['bush_leaves'] = 'tfc:wood/leaves/%s' % tree
-    if old_growth:
-        cfg['old_growth_tree'] = 'tfc:tree/%s_large' % tree
-    rm.configured_feature('tree/%s_entry' % tree, 'tfc:forest_entry', cfg)
-    cfg['dead_chance'] = 1
-    cfg['fallen_tree_chance'] = 8
-    cfg['floating'] = None
-    rm.configured_feature('tree/dead_%s_entry' % tree, 'tfc:forest_entry', cfg)
+    return cfg
 
 
 def overlay_config(tree: str, min_height: int, max_height: int, width: int = 1, radius: int = 1, suffix: str = '', place=None, roots=None):
-    block = 'tfc:wood/log/%s[axis=y,branch_direction=none]' % tree
-    tree += suffix
     return {
-        'base': 'tfc:%s/base' % tree,
-        'overlay': 'tfc:%s/overlay' % tree,
-        'trunk': trunk_config(block, min_height, max_height, width),
+        'base': 'tfc:%s%s/base' % (tree, suffix),
+        'overlay': 'tfc:%s%s/overlay' % (tree, suffix),
+        'trunk': tree_trunk_config(tree, min_height, max_height, width),
         'radius': radius,
         'placement': place,
         'root_system': roots
@@ -3086,27 +3235,23 @@ def overlay_config(tree: str, min_height: int, max_height: int, width: int = 1,
 
 
 def random_config(tree: str, structure_count: int, radius: int = 1, suffix: str = '', trunk: List = None, place=None, roots=None):
-    block = 'tfc:wood/log/%s[axis=y,branch_direction=none]' % tree
-    tree += suffix
     cfg = {
-        'structures': ['tfc:%s/%d' % (tree, i) for i in range(1, 1 + structure_count)],
+        'structures': tree_structures(tree + suffix, structure_count),
         'radius': radius,
         'placement': place,
         'root_system': roots
     }
     if trunk is not None:
-        cfg['trunk'] = trunk_config(block, *trunk)
+        cfg['trunk'] = tree_trunk_config(tree, *trunk)
     return cfg
 
 
 def stacked_config(tree: str, min_height: int, max_height: int, width: int, layers: List[Tuple[int, int, int]], radius: int = 1, suffix: str = '', place: Json = None, roots=None) -> JsonObject:
     # layers consists of each layer, which is a (min_count, max_count, total_templates)
-    block = 'tfc:wood/log/%s[axis=y,branch_direction=none]' % tree
-    tree += suffix
     return {
-        'trunk': trunk_config(block, min_height, max_height, width),
+        'trunk': tree_trunk_config(tree, min_height, max_height, width),
         'layers': [{
-            'templates': ['tfc:%s/layer%d_%d' % (tree, 1 + i, j) for j in range(1, 1 + layer[2])],
+            'templates': tree_layer_templates(tree + suffix, 1 + i, layer[2]),
             'min_count': layer[0],
             'max_count': layer[1]
         } for i, layer in enumerate(layers)],
@@ -3116,6 +3261,21 @@ def stacked_config(tree: str, min_height: int, max_height: int, width: int, laye
     }
 
 
+@lru_cache(maxsize=None)
+def tree_structures(tree: str, structure_count: int) -> Tuple[str, ...]:
+    return tuple('tfc:%s/%d' % (tree, i) for i in range(1, 1 + structure_count))
+
+
+@lru_cache(maxsize=None)
+def tree_layer_templates(tree: str, layer: int, template_count: int) -> Tuple[str, ...]:
+    return tuple('tfc:%s/layer%d_%d' % (tree, layer, j) for j in range(1, 1 + template_count))
+
+
+def tree_trunk_config(tree: str, min_height: int, max_height: int, width: int) -> JsonObject:
+    return trunk_config('tfc:wood/log/%s[axis=y,branch_direction=none]' % tree, min_height, max_height, width)
+
+
+@lru_cache(maxsize=None)
 def trunk_config(block: str, min_height: int, max_height: int, width: int) -> JsonObject:
     assert width == 1 or width == 2
     return {
@@ -3125,25 +3285,34 @@ def trunk_config(block: str, min_height: int, max_height: int, width: int) -> Js
         'wide': width == 2,
     }
 
-def root_config(width: int, height: int, tries: int, mangrove: bool = False) -> JsonObject:
+
+@lru_cache(maxsize=None)
+def root_replacement_blocks() -> Tuple[JsonObject, ...]:
     blocks = [{
-        'replace': ['tfc:%s/%s' % (variant, soil)],
-        'with': [{'block': 'tfc:rooted_dirt/%s' % soil}]
+        'replace': ('tfc:%s/%s' % (variant, soil),),
+        'with': ({'block': 'tfc:rooted_dirt/%s' % soil},)
     } for soil in SOIL_BLOCK_VARIANTS for variant in ('grass', 'dirt')]
     blocks += [{
-        'replace': ['tfc:mud/%s' % soil],
-        'with': [{'block': 'tfc:muddy_roots/%s' % soil}]
+        'replace': ('tfc:mud/%s' % soil,),
+        'with': ({'block': 'tfc:muddy_roots/%s' % soil},)
     } for soil in SOIL_BLOCK_VARIANTS]
+    return tuple(blocks)
+
+
+MANGROVE_ROOT_PLACER: JsonObject = {
+    'skew_chance': 0.2
+}
+
+
+def root_config(width: int, height: int, tries: int, mangrove: bool = False) -> JsonObject:
     cfg = {
-        'blocks': blocks,
+        'blocks': root_replacement_blocks(),
         'width': width,
         'height': height,
         'tries': tries
     }
     if mangrove:
-        cfg['special_placer'] = {
-            'skew_chance': 0.2
-        }
+        cfg['special_placer'] = MANGROVE_ROOT_PLACER
         cfg['required'] = True
     return cfg
 
@@ -3336,7 +3505,98 @@ def height_provider(min_y: VerticalAnchor, max_y: VerticalAnchor, height_type: H
     }
 
 
+class BiomeEntry(NamedTuple):
+    name: str
+    category: str
+    boulders: bool = False
+    spawnable: bool = True
+    ocean_features: Union[bool, Literal['both']] = False
+    lake_features: Union[bool, Literal['default']] = 'default'
+    volcano_features: bool = False
+    reef_features: bool = False
+    hot_spring_features: Union[bool, Literal['empty']] = False
+
+
+class BiomeComposition(NamedTuple):
+    spawners: Dict[str, Tuple[Dict[str, Any], ...]]
+    soil_discs: Tuple[str, ...]
+    large_features: Tuple[str, ...]
+    surface_decorations: Tuple[str, ...]
+    costs: JsonObject
+    lake_features: bool
+
+
+BIOME_EFFECTS: JsonObject = {
+    'fog_color': 0xC0D8FF,
+    'sky_color': 0x84E6FF,
+    'water_color': 0x3F76E4,
+    'water_fog_color': 0x050533
+}
+
+
+def biomes(rm: ResourceManager, *entries: BiomeEntry):
+    # Biomes which share the same flags share the same (cached) feature and spawner composition
+    for entry in entries:
+        biome(rm, *entry)
+
+
 def biome(rm: ResourceManager, name: str, category: str, boulders: bool = False, spawnable: bool = True, ocean_features: Union[bool, Literal['both']] = False, lake_features: Union[bool, Literal['default']] = 'default', volcano_features: bool = False, reef_features: bool = False, hot_spring_features: Union[bool, Literal['empty']] = False):
+    composition = biome_composition(category, boulders, ocean_features, lake_features, volcano_features, reef_features, hot_spring_features, *biome_name_flags(name))
+
+    # Feature Tags
+    # We don't directly use vanilla's generation step, but we line this up *approximately* with it, so that mods that add features add them in roughly the right location
+    feature_tags = [
+        '#tfc:in_biome/erosion',  # Raw Generation
+        '#tfc:in_biome/all_lakes' if composition.lake_features else '#tfc:in_biome/underground_lakes',  # Lakes
+        '#tfc:in_biome/soil_discs/%s' % name,  # Local Modifications
+        '#tfc:in_biome/underground_structures',  # Underground Structures
+        '#tfc:in_biome/surface_structures',  # Surface Structures
+        '#tfc:in_biome/strongholds',  # Strongholds
+        '#tfc:in_biome/veins',  # Underground Ores
+        '#tfc:in_biome/underground_decoration',  # Underground Decoration
+        '#tfc:in_biome/large_features/%s' % name,  # Fluid Springs (we co-opt this as they likely won't interfere and it's in the right order)
+        '#tfc:in_biome/surface_decoration/%s' % name,  # Vegetal Decoration
+        '#tfc:in_biome/top_layer_modification'  # Top Layer Modification
+    ]
+
+    rm.placed_feature_tag(('in_biome/soil_discs', name), *composition.soil_discs)
+    rm.placed_feature_tag(('in_biome/large_features', name), *composition.large_features)
+    rm.placed_feature_tag(('in_biome/surface_decoration', name), *composition.surface_decorations)
+
+    if volcano_features:
+        rm.biome_tag('is_volcanic', name)
+    if 'lake' in name:
+        rm.biome_tag('is_lake', name)
+    if 'river' in name:
+        rm.biome_tag('is_river', name)
+    if 'ocean' in name and 'mountain' not in name:
+        rm.biome_tag('is_ocean', name)
+
+    rm.lang('biome.tfc.%s' % name, lang(name))
+    mcresources_biome(rm,
+        name_parts=name,
+        has_precipitation=True,
+        category=category,
+        temperature=0.5,
+        downfall=0.5,
+        effects=BIOME_EFFECTS,
+        spawners=composition.spawners,
+        air_carvers=('tfc:cave', 'tfc:canyon'),
+        water_carvers=(),
+        features=feature_tags,
+        player_spawn_friendly=spawnable,
+        creature_spawn_probability=0.08,
+        spawn_costs=composition.costs
+    )
+
+
+def biome_name_flags(name: str) -> Tuple[bool, ...]:
+    # The few parts of a biome's composition which depend on the name, rather than the flags
+    return name == 'tidal_flats', name == 'shore', name == 'deep_ocean_trench', 'lake' in name, name == 'salt_marsh', 'salt_marsh' in name, 'lowlands' in name
+
+
+@lru_cache(maxsize=None)
+def biome_composition(category: str, boulders: bool, ocean_features: Union[bool, Literal['both']], lake_features: Union[bool, Literal['default']], volcano_features: bool, reef_features: bool, hot_spring_features: Union[bool, Literal['empty']], tidal_flats: bool, shore: bool, trench: bool, lake: bool, salt_marsh: bool, salt_marsh_like: bool, lowlands: bool) -> BiomeComposition:
     spawners = {}
     soil_discs = []
     large_features = []
@@ -3357,21 +3617,21 @@ def biome(rm: ResourceManager, name: str, category: str, boulders: bool = False,
     # Oceans
     if ocean_features:
         large_features.append('#tfc:feature/icebergs')
-        if name != 'tidal_flats':
+        if not tidal_flats:
             surface_decorations.append('#tfc:feature/ocean_plants')
-        if name == 'shore':
+        if shore:
             surface_decorations.append('tfc:plant/beachgrass_patch')
             surface_decorations.append('tfc:plant/sea_palm_patch')
 
         if category == 'beach':
             surface_decorations.append('#tfc:feature/shore_decorations')
-            spawners['creature'] = [entity for entity in SHORE_CREATURES.values()]
+            spawners['creature'] = tuple(SHORE_CREATURES.values())
         else:
             surface_decorations.append('#tfc:feature/ocean_decorations')
 
-        spawners['water_ambient'] = [entity for entity in OCEAN_AMBIENT.values()]
-        spawners['water_creature'] = [entity for entity in OCEAN_CREATURES.values()]
-        spawners['underground_water_creature'] = [entity for entity in UNDERGROUND_WATER_CREATURES.values()]
+        spawners['water_ambient'] = tuple(OCEAN_AMBIENT.values())
+        spawners['water_creature'] = tuple(OCEAN_CREATURES.values())
+        spawners['underground_water_creature'] = tuple(UNDERGROUND_WATER_CREATURES.values())
         costs['tfc:octopoteuthis'] = {'energy_budget': 0.12, 'charge': 1.0}
 
     if category in ('river', 'lake'):
@@ -3379,19 +3639,19 @@ def biome(rm: ResourceManager, name: str, category: str, boulders: bool = False,
     if category in ('lake', 'swamp', 'river'):
         surface_decorations.append('tfc:plant/dry_phragmite')
     if category == 'river':
-        spawners['water_ambient'] = [entity for entity in RIVER_AMBIENT.values()]
+        spawners['water_ambient'] = tuple(RIVER_AMBIENT.values())
 
-    if name == 'deep_ocean_trench':
+    if trench:
         large_features.append('tfc:lava_hot_spring')
 
-    if 'lake' in name:
-        spawners['water_ambient'] = [entity for entity in LAKE_AMBIENT.values()]
-        spawners['water_creature'] = [entity for entity in LAKE_CREATURES.values()]
+    if lake:
+        spawners['water_ambient'] = tuple(LAKE_AMBIENT.values())
+        spawners['water_creature'] = tuple(LAKE_CREATURES.values())
     if 'swamp' == category:
-        spawners['water_ambient'] = [entity for entity in LAKE_AMBIENT.values()]
-    if 'salt_marsh' == name:
-        spawners['water_ambient'] = [entity for entity in SALT_MARSH_AMBIENT.values()]
-    spawners['monster'] = [entity for entity in VANILLA_MONSTERS.values()]
+        spawners['water_ambient'] = tuple(LAKE_AMBIENT.values())
+    if salt_marsh:
+        spawners['water_ambient'] = tuple(SALT_MARSH_AMBIENT.values())
+    spawners['monster'] = tuple(VANILLA_MONSTERS.values())
 
     if reef_features:
         large_features.append('tfc:coral_reef')
@@ -3399,16 +3659,16 @@ def biome(rm: ResourceManager, name: str, category: str, boulders: bool = False,
     # Continental / Land Features
     if land_features:
         soil_discs.append('#tfc:feature/soil_discs')
-        if 'salt_marsh' not in name:
+        if not salt_marsh_like:
             large_features += ['tfc:forest']
         else:
             large_features += ['tfc:mangrove_forest']
             surface_decorations += ['tfc:plant/marsh_jungle_vines']
-        if 'lowlands' in name:
+        if lowlands:
             large_features += ['tfc:dead_forest']
         large_features += ['tfc:rare_bamboo', 'tfc:bamboo', 'tfc:cave_vegetation']
         surface_decorations.append('#tfc:feature/land_plants')
-        spawners['creature'] = [entity for entity in LAND_CREATURES.values()]
+        spawners['creature'] = tuple(LAND_CREATURES.values())
 
     if volcano_features:
         large_features.append('#tfc:feature/volcanoes')
@@ -3419,56 +3679,7 @@ def biome(rm: ResourceManager, name: str, category: str, boulders: bool = False,
         else:
             large_features.append('tfc:random_active_hot_spring')
 
-    # Feature Tags
-    # We don't directly use vanilla's generation step, but we line this up *approximately* with it, so that mods that add features add them in roughly the right location
-    feature_tags = [
-        '#tfc:in_biome/erosion',  # Raw Generation
-        '#tfc:in_biome/all_lakes' if lake_features else '#tfc:in_biome/underground_lakes',  # Lakes
-        '#tfc:in_biome/soil_discs/%s' % name,  # Local Modifications
-        '#tfc:in_biome/underground_structures',  # Underground Structures
-        '#tfc:in_biome/surface_structures',  # Surface Structures
-        '#tfc:in_biome/strongholds',  # Strongholds
-        '#tfc:in_biome/veins',  # Underground Ores
-        '#tfc:in_biome/underground_decoration',  # Underground Decoration
-        '#tfc:in_biome/large_features/%s' % name,  # Fluid Springs (we co-opt this as they likely won't interfere and it's in the right order)
-        '#tfc:in_biome/surface_decoration/%s' % name,  # Vegetal Decoration
-        '#tfc:in_biome/top_layer_modification'  # Top Layer Modification
-    ]
-
-    rm.placed_feature_tag(('in_biome/soil_discs', name), *soil_discs)
-    rm.placed_feature_tag(('in_biome/large_features', name), *large_features)
-    rm.placed_feature_tag(('in_biome/surface_decoration', name), *surface_decorations)
-
-    if volcano_features:
-        rm.biome_tag('is_volcanic', name)
-    if 'lake' in name:
-        rm.biome_tag('is_lake', name)
-    if 'river' in name:
-        rm.biome_tag('is_river', name)
-    if 'ocean' in name and 'mountain' not in name:
-        rm.biome_tag('is_ocean', name)
-
-    rm.lang('biome.tfc.%s' % name, lang(name))
-    mcresources_biome(rm,
-        name_parts=name,
-        has_precipitation=True,
-        category=category,
-        temperature=0.5,
-        downfall=0.5,
-        effects={
-            'fog_color': 0xC0D8FF,
-            'sky_color': 0x84E6FF,
-            'water_color': 0x3F76E4,
-            'water_fog_color': 0x050533
-        },
-        spawners=spawners,
-        air_carvers=['tfc:cave', 'tfc:canyon'],
-        water_carvers=[],
-        features=feature_tags,
-        player_spawn_friendly=spawnable,
-        creature_spawn_probability=0.08,
-        spawn_costs=costs
-    )
+    return BiomeComposition(spawners, tuple(soil_discs), tuple(large_features), tuple(surface_decorations), costs, bool(lake_features))
 
 
 def expand_rocks(rocks: list[str]) -> list[str]:
@@ -3476,7 +3687,7 @@ def expand_rocks(rocks: list[str]) -> list[str]:
     return [
         rock
         for spec in rocks
-        for rock in ([spec] if spec in ROCKS else [r for r, d in ROCKS.items() if d.category == spec])
+        for rock in ((spec,) if spec in ROCKS else ROCKS_BY_CATEGORY[spec])
     ]
 
 
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+RESULT_PREFIX = 'BENCHMARK '
+METRICS = ('wall', 'cpu', 'files', 'bytes', 'writes', 'rss_growth_kb')
+TIME_METRICS = ('wall', 'cpu')
+DEFAULT_BASELINE = os.path.join('resources', 'benchmark_baseline.json')
+
+
+class Regression(NamedTuple):
+    mode: str  # 'cold' or 'warm'
+    section: str
+    metric: str
+    baseline: float
+    value: float
+
+
+def cpu_time() -> float:
+    """ User and system time of this process and finished child processes, which includes validation's worker processes """
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+def reset_peak_rss() -> bool:
+    """ Resets the process' peak resident set size, which Linux supports through /proc/self/clear_refs """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def status_kb(field: str) -> Optional[int]:
+    """ A memory field of /proc/self/status, i.e. 'VmRSS' for the current resident set size, or 'VmHWM' for its peak. None where there is no /proc. """
+    try:
+        with open('/proc/self/status', 'r') as f:
+            return next((int(line.split()[1]) for line in f if line.startswith(field + ':')), None)
+    except OSError:
+        return None
+
+
+def peak_rss_kb() -> int:
+    """ The peak resident set size since the last reset, or since the process started """
+    peak = status_kb('VmHWM')
+    return peak if peak is not None else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Kilobytes on Linux
+
+
+def snapshot(root: str) -> Dict[str, Tuple[int, int]]:
+    files = {}
+    for directory, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(directory, name)
+            stat = os.stat(path)
+            files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def run_worker(generator_args: List[str]):
+    """ Runs the generator in this process, in the current directory, timing each top level generate_* function, and prints the sections as json """
+    import main as generator
+
+    root = os.path.join(*generator.rm.resource_dir)
+    sections: Dict[str, Dict[str, float]] = {}
+    depth = [0]
+
+    def counters() -> int:
+        return generator.rm.new_files + generator.rm.modified_files + generator.rm.unchanged_files
+
+    peaks: List[int] = []  # The peak RSS of each section in progress, including the sections nested in it
+
+    def measure(name: str, call: Callable) -> Any:
+        # A section's memory is how far its peak RSS rose above the RSS it started with. Without a resettable peak, this is how far it raised the process' peak
+        start = status_kb('VmRSS') if reset_peak_rss() else peak_rss_kb()
+        peaks.append(start)
+        before, writes, wall, cpu = snapshot(root), counters(), time.perf_counter(), cpu_time()
+        try:
+            return call()
+        finally:
+            wall, cpu = time.perf_counter() - wall, cpu_time() - cpu
+            after = snapshot(root)
+            changed = [path for path, stat in after.items() if before.get(path) != stat]
+            deleted = before.keys() - after.keys()
+            peak = max(peak_rss_kb(), peaks.pop())
+            if peaks:
+                peaks[-1] = max(peaks[-1], peak)
+            section = sections.setdefault(name, dict.fromkeys(METRICS, 0))
+            section.update(
+                wall=section['wall'] + wall,
+                cpu=section['cpu'] + cpu,
+                files=section['files'] + len(changed) + len(deleted),
+                bytes=section['bytes'] + sum(after[path][0] for path in changed),
+                writes=section['writes'] + counters() - writes,
+                rss_growth_kb=max(section['rss_growth_kb'], peak - start)
+            )
+
+    def timed(name: str, function: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            if depth[0] > 0:  # Nested sections, i.e. generate_fluid_tags within generate_tags, are counted by their caller
+                return function(*args, **kwargs)
+            depth[0] += 1
+            try:
+                return measure(name, lambda: function(*args, **kwargs))
+            finally:
+                depth[0] -= 1
+        return wrapper
+
+    for name in dir(generator):
+        if name.startswith('generate_') and callable(getattr(generator, name)):
+            setattr(generator, name, timed(name, getattr(generator, name)))
+    generator.rm.flush = timed('flush', generator.rm.flush)
+    sys.argv = ['main.py', *generator_args]
+    measure('total', generator.main)
+    print(RESULT_PREFIX + json.dumps(sections))
+
+
+def run_iteration(work_dir: str, generator_args: List[str]) -> Dict[str, Dict[str, float]]:
+    process = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', *generator_args], cwd=work_dir, capture_output=True, text=True)
+    if process.returncode != 0:
+        raise ValueError('Generator failed in %s:\n%s' % (work_dir, process.stderr))
+    return json.loads(next(line for line in reversed(process.stdout.splitlines()) if line.startswith(RESULT_PREFIX))[len(RESULT_PREFIX):])
+
+
+def prepare(source: str, work_dir: str):
+    """ Copies the source tree, and removes every generated resource so the generator writes all of them """
+    from bundles import generated_resources
+    from mcresources import ResourceManager
+
+    shutil.copytree(os.path.join(source, 'src'), os.path.join(work_dir, 'src'))
+    rm = ResourceManager('poisoned_drinks', resource_dir=os.path.relpath(os.path.join(work_dir, 'src', 'main', 'resources')))  # Absolute paths lose their root when split into parts
+    for pack_type in ('data', 'assets'):
+        for namespace, path in generated_resources(rm, pack_type):
+            os.remove(os.path.join(*rm.resource_dir, pack_type, namespace, path))
+
+
+def summarize(runs: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """ The median of each metric of each section, over all runs """
+    return {section: {metric: statistics.median(run[section][metric] for run in runs) for metric in METRICS} for section in runs[0]}
+
+
+def benchmark(source: str, cold: int, warm: int, generator_args: List[str]) -> Dict[str, Any]:
+    """
+    Cold iterations each run a fresh process on a fresh copy of the tree, with every generated file removed. Warm iterations rerun the generator on one tree it has already generated, so unchanged files are not rewritten.
+    """
+    results: Dict[str, Any] = {'python': platform.python_version(), 'platform': platform.platform(), 'args': generator_args}
+    runs: Dict[str, List[Dict[str, Dict[str, float]]]] = {'cold': [], 'warm': []}
+    with tempfile.TemporaryDirectory() as temp:
+        for i in range(max(cold, 1 if warm else 0)):
+            work_dir = os.path.join(temp, 'cold_%d' % i)
+            prepare(source, work_dir)
+            run = run_iteration(work_dir, generator_args)
+            if i < cold:
+                runs['cold'].append(run)
+        for _ in range(warm):
+            runs['warm'].append(run_iteration(os.path.join(temp, 'cold_0'), generator_args))
+    for mode, mode_runs in runs.items():
+        if mode_runs:
+            results[mode] = {'runs': mode_runs, 'median': summarize(mode_runs)}
+    return results
+
+
+def regressions(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float, min_time: float, min_rss_kb: int) -> List[Regression]:
+    """ Every median which exceeds the baseline's by more than `threshold`, as a fraction. Times below `min_time` seconds and RSS growth below `min_rss_kb` in the baseline are too noisy to compare. """
+    found = []
+    for mode in ('cold', 'warm'):
+        for section, metrics in results.get(mode, {}).get('median', {}).items():
+            base = baseline.get(mode, {}).get('median', {}).get(section)
+            if base is None:
+                continue
+            for metric in METRICS:
+                if (metric in TIME_METRICS and base[metric] < min_time) or (metric == 'rss_growth_kb' and base[metric] < min_rss_kb):
+                    continue
+                if metrics[metric] > base[metric] * (1 + threshold):
+                    found.append(Regression(mode, section, metric, base[metric], metrics[metric]))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the resource generator, section by section')
+    parser.add_argument('--cold', type=int, default=3, help='Iterations in a fresh process, on a fresh copy of the tree with no generated files')
+    parser.add_argument('--warm', type=int, default=3, help='Iterations on a tree which has already been generated')
+    parser.add_argument('--output', default='benchmark_results.json', help='Where to write the results')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Results to compare against. The comparison is skipped if this does not exist')
+    parser.add_argument('--save-baseline', action='store_true', dest='save_baseline', help='Store the results as the new baseline, instead of comparing')
+    parser.add_argument('--threshold', type=float, default=0.3, help='The fraction a metric may exceed the baseline by')
+    parser.add_argument('--min-time', type=float, default=0.05, dest='min_time', help='Sections which took less than this many seconds in the baseline are not compared by time')
+    parser.add_argument('--min-rss', type=int, default=1024, dest='min_rss', help='Sections whose RSS grew by less than this many KB in the baseline are not compared by memory')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('generator_args', nargs=argparse.REMAINDER, help='Arguments passed to main.py, i.e. --release')
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.generator_args)
+        return
+
+    results = benchmark(os.getcwd(), args.cold, args.warm, args.generator_args)
+    for mode in ('cold', 'warm'):
+        if mode in results:
+            print('%s (median of %d):' % (mode.capitalize(), len(results[mode]['runs'])))
+            for section, metrics in results[mode]['median'].items():
+                print('\t%-24s %8.3fs wall %8.3fs cpu %5d files %9d bytes %5d writes %8d KB rss growth' % (section, *(metrics[metric] for metric in METRICS)))
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print('Saved baseline to %s' % args.baseline)
+    elif os.path.isfile(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        found = regressions(results, baseline, args.threshold, args.min_time, args.min_rss)
+        for regression in found:
+            print('\tRegression in %s %s %s: %.3f -> %.3f' % regression)
+        if found:
+            raise ValueError('%d metrics regressed by more than %.0f%% against %s' % (len(found), 100 * args.threshold, args.baseline))
+    else:
+        print('No baseline at %s, run with --save-baseline to create one' % args.baseline)
+
+
+if __name__ == '__main__':
+    main()
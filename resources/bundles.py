@@ -0,0 +1,57 @@
+import json
+import os
+import shutil
+from typing import Any, Dict, Tuple
+
+from mcresources import ResourceManager
+
+
+GENERATED_COMMENT = 'This file was automatically created by mcresources'
+BUNDLE_DIR = 'bundles'
+PACK_TYPES = ('data', 'assets')
+
+
+def generated_resources(rm: ResourceManager, pack_type: str) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """ Every generated json file of a pack type, keyed by (namespace, path), where path includes the registry directory and extension """
+    resources = {}
+    root = os.path.join(*rm.resource_dir, pack_type)
+    for directory, _, files in os.walk(root):
+        for file in files:
+            if not file.endswith('.json'):
+                continue
+            path = os.path.join(directory, file)
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict) and data.get('__comment__') == GENERATED_COMMENT:
+                namespace, resource = os.path.relpath(path, root).replace(os.sep, '/').split('/', 1)
+                resources[namespace, resource] = data
+    return resources
+
+
+def remove_bundles(rm: ResourceManager):
+    bundle_dir = os.path.join(*rm.resource_dir, BUNDLE_DIR)
+    if os.path.isdir(bundle_dir):
+        shutil.rmtree(bundle_dir)
+
+
+def write_bundles(rm: ResourceManager) -> Dict[str, int]:
+    """
+    Packs every generated resource into one bundle file per pack type and registry directory (i.e. bundles/data/recipes.json), and removes the individual files.
+    Bundles are listed in bundles/manifest.json, which the mod reads to expand them into a built-in pack at runtime.
+    Returns the number of resources in each bundle.
+    """
+    remove_bundles(rm)
+    manifest: Dict[str, list] = {}
+    counts: Dict[str, int] = {}
+    for pack_type in PACK_TYPES:
+        bundles: Dict[str, Dict[str, Any]] = {}
+        for (namespace, resource), data in sorted(generated_resources(rm, pack_type).items()):
+            del data['__comment__']
+            bundles.setdefault(resource.split('/', 1)[0], {})['%s:%s' % (namespace, resource)] = data
+            os.remove(os.path.join(*rm.resource_dir, pack_type, namespace, resource))
+        for name, bundle in bundles.items():
+            rm.write((*rm.resource_dir, BUNDLE_DIR, pack_type, name), bundle)
+            counts['%s/%s' % (pack_type, name)] = len(bundle)
+        manifest[pack_type] = sorted(bundles)
+    rm.write((*rm.resource_dir, BUNDLE_DIR, 'manifest'), manifest)
+    return counts
@@ -0,0 +1,146 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+NODE_CAPACITY = 8
+TEMPERATURE_RANGE = (-20, 35)  # The span of average temperatures (C) in TFC worlds
+RAINFALL_RANGE = (0, 500)  # The span of annual rainfall (mm) in TFC worlds
+
+
+class Envelope(NamedTuple):
+    name: str
+    kind: str  # The table the entry came from, i.e. 'crop', 'plant'
+    min_temp: float
+    max_temp: float
+    min_rain: float
+    max_rain: float
+
+
+class RNode(NamedTuple):
+    bounds: Tuple[float, float, float, float]  # (min_temp, max_temp, min_rain, max_rain) covering every child
+    children: Tuple[Any, ...]  # RNodes, or Envelopes at the leaves
+    leaf: bool
+
+
+class CoverageReport(NamedTuple):
+    cells: int  # Points sampled across the climate space
+    uncovered: float  # Fraction of points where nothing grows
+    mean_depth: float  # Mean number of envelopes covering a point
+    max_depth: int
+    coverage: Dict[str, float]  # 'kind/name' -> fraction of the climate space it covers
+    exclusive: Dict[str, float]  # 'kind/name' -> fraction of the climate space where it is the only entry
+
+
+def envelopes(kind: str, table: Dict[str, Any]) -> List[Envelope]:
+    """ Envelopes of every entry in a table of Crop, Plant, Berry or Fruit (anything with min/max temp and rain) """
+    return [Envelope(name, kind, data.min_temp, data.max_temp, data.min_rain, data.max_rain) for name, data in table.items()]
+
+
+def envelope_key(envelope: Envelope) -> str:
+    return envelope.kind + '/' + envelope.name
+
+
+def bounds_of(entries: Sequence[Any]) -> Tuple[float, float, float, float]:
+    boxes = [entry.bounds if isinstance(entry, RNode) else entry[2:] for entry in entries]
+    return min(b[0] for b in boxes), max(b[1] for b in boxes), min(b[2] for b in boxes), max(b[3] for b in boxes)
+
+
+def center(entry: Any) -> Tuple[float, float]:
+    b = entry.bounds if isinstance(entry, RNode) else entry[2:]
+    return (b[0] + b[1]) / 2, (b[2] + b[3]) / 2
+
+
+def pack(entries: Sequence[Any], leaf: bool) -> List[RNode]:
+    """ One level of sort-tile-recursive packing: slice by temperature, then tile each slice by rainfall """
+    node_count = -(-len(entries) // NODE_CAPACITY)
+    slice_count = max(1, round(node_count ** 0.5))
+    slice_size = -(-len(entries) // slice_count)
+    by_temp = sorted(entries, key=center)
+    nodes = []
+    for i in range(0, len(by_temp), slice_size):
+        column = sorted(by_temp[i:i + slice_size], key=lambda e: center(e)[1])
+        for j in range(0, len(column), NODE_CAPACITY):
+            children = tuple(column[j:j + NODE_CAPACITY])
+            nodes.append(RNode(bounds_of(children), children, leaf))
+    return nodes
+
+
+class ClimateIndex:
+    """ A static, bulk loaded R-tree over climate envelopes. Point and overlap queries visit O(log n) nodes plus the results. """
+
+    def __init__(self, entries: Sequence[Envelope]):
+        self.entries = list(entries)
+        self.root: Optional[RNode] = None
+        if self.entries:
+            level, leaf = self.entries, True
+            while True:
+                level, leaf = pack(level, leaf), False
+                if len(level) == 1:
+                    break
+            self.root = level[0]
+
+    def search(self, min_temp: float, max_temp: float, min_rain: float, max_rain: float) -> List[Envelope]:
+        """ Every envelope intersecting a rectangle of climate space, with bounds inclusive """
+        found, pending = [], [self.root] if self.root is not None else []
+        while pending:
+            node = pending.pop()
+            for child in node.children:
+                b = child.bounds if not node.leaf else child[2:]
+                if b[0] <= max_temp and min_temp <= b[1] and b[2] <= max_rain and min_rain <= b[3]:
+                    if node.leaf:
+                        found.append(child)
+                    else:
+                        pending.append(child)
+        return found
+
+    def at(self, temp: float, rain: float) -> List[Envelope]:
+        """ What grows at a temperature and rainfall """
+        return self.search(temp, temp, rain, rain)
+
+    def overlaps(self) -> List[Tuple[Envelope, Envelope]]:
+        """ Every pair of envelopes which share some climate """
+        positions = {id(entry): i for i, entry in enumerate(self.entries)}
+        pairs = []
+        for i, entry in enumerate(self.entries):
+            for other in self.search(*entry[2:]):
+                if positions[id(other)] > i:
+                    pairs.append((entry, other))
+        return sorted(pairs, key=lambda pair: (positions[id(pair[0])], positions[id(pair[1])]))
+
+    def coverage(self, temp_range: Tuple[float, float] = TEMPERATURE_RANGE, rain_range: Tuple[float, float] = RAINFALL_RANGE, temp_step: float = 1, rain_step: float = 10) -> CoverageReport:
+        """ Samples the climate space on a grid, counting how many envelopes grow at each point """
+        points = [(temp_range[0] + i * temp_step, rain_range[0] + j * rain_step) for i in range(int((temp_range[1] - temp_range[0]) / temp_step) + 1) for j in range(int((rain_range[1] - rain_range[0]) / rain_step) + 1)]
+        covered: Dict[str, int] = {envelope_key(entry): 0 for entry in self.entries}
+        exclusive: Dict[str, int] = {envelope_key(entry): 0 for entry in self.entries}
+        depths = []
+        for temp, rain in points:
+            found = self.at(temp, rain)
+            depths.append(len(found))
+            for entry in found:
+                covered[envelope_key(entry)] += 1
+            if len(found) == 1:
+                exclusive[envelope_key(found[0])] += 1
+        return CoverageReport(
+            len(points),
+            sum(d == 0 for d in depths) / len(points),
+            sum(depths) / len(points),
+            max(depths, default=0),
+            {name: count / len(points) for name, count in covered.items()},
+            {name: count / len(points) for name, count in exclusive.items()}
+        )
+
+
+def climate_bands(entries: Sequence[Envelope]) -> List[List[Envelope]]:
+    """ Groups envelopes into bands, where each band is a connected set of overlapping envelopes. Bands are ordered by their coldest envelope. """
+    index = ClimateIndex(entries)
+    parent = {id(entry): entry for entry in index.entries}
+
+    def find(entry: Envelope) -> Envelope:
+        while parent[id(entry)] is not entry:
+            entry = parent[id(entry)]
+        return entry
+
+    for first, second in index.overlaps():
+        parent[id(find(second))] = find(first)
+    bands: Dict[int, List[Envelope]] = {}
+    for entry in index.entries:
+        bands.setdefault(id(find(entry)), []).append(entry)
+    return sorted(bands.values(), key=lambda band: min((entry.min_temp, entry.min_rain) for entry in band))
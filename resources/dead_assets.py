@@ -0,0 +1,71 @@
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from mcresources import ResourceManager
+
+from model_dedup import load_json_tree, resource_id
+
+
+def json_strings(data: Any) -> Iterator[str]:
+    if isinstance(data, str):
+        yield data
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from json_strings(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from json_strings(value)
+
+
+def texture_files(assets: str) -> Dict[str, str]:
+    """ Texture id -> path of every png below textures/ """
+    root = os.path.join(assets, 'textures')
+    textures = {}
+    for directory, _, files in os.walk(root):
+        for file in files:
+            if file.endswith('.png'):
+                path = os.path.join(directory, file)
+                textures[os.path.relpath(path, root)[:-4].replace(os.sep, '/')] = path
+    return textures
+
+
+def find_dead_assets(rm: ResourceManager, roots: Iterable[str] = ()) -> Tuple[List[str], List[str]]:
+    """
+    Builds the reference graph of this domain's assets and returns the (models, textures) which are unreachable.
+    Blockstates, item models (looked up by item id) and any additional `roots` (model or texture ids) are the roots. Any string in a blockstate or model which names an existing model or texture is an edge.
+    """
+    assets = os.path.join(*rm.resource_dir, 'assets', rm.domain)
+    prefix = rm.domain + ':'
+    models = {prefix + path: model for path, model in load_json_tree(os.path.join(assets, 'models')).items()}
+    textures = {prefix + path: file for path, file in texture_files(assets).items()}
+
+    def edges(data: Any) -> Iterator[str]:
+        for value in json_strings(data):
+            if not value.startswith('#'):
+                value = resource_id(value)
+                if value in models or value in textures:
+                    yield value
+
+    reachable: Set[str] = set()
+    pending = [*roots, *(name for name in models if name.startswith(prefix + 'item/'))]
+    for blockstate in load_json_tree(os.path.join(assets, 'blockstates')).values():
+        pending.extend(edges(blockstate))
+    while pending:
+        name = pending.pop()
+        if name not in reachable:
+            reachable.add(name)
+            if name in models:
+                pending.extend(edges(models[name]))
+
+    return sorted(name for name in models if name not in reachable), sorted(name for name in textures if name not in reachable)
+
+
+def remove_dead_assets(rm: ResourceManager, models: Iterable[str], textures: Iterable[str]):
+    assets = os.path.join(*rm.resource_dir, 'assets', rm.domain)
+    for name in models:
+        os.remove(os.path.join(assets, 'models', name.split(':', 1)[1] + '.json'))
+    for name in textures:
+        path = os.path.join(assets, 'textures', name.split(':', 1)[1] + '.png')
+        os.remove(path)
+        if os.path.isfile(path + '.mcmeta'):
+            os.remove(path + '.mcmeta')
@@ -0,0 +1,106 @@
+import json
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Sequence, Tuple
+
+from mcresources import ResourceManager
+
+from validation import load_resources
+
+KNAPPING_SIZE = 5
+FULL_GRID = (1 << KNAPPING_SIZE * KNAPPING_SIZE) - 1
+
+
+class KnappingRecipe(NamedTuple):
+    id: str
+    knapping_type: str
+    grids: FrozenSet[int]  # Every 5x5 grid the recipe matches, see knapping_grids()
+    result: str  # The result item stack as canonical json, for comparing results
+
+
+class KnappingReport(NamedTuple):
+    conflicts: List[Tuple[str, str]]  # Recipes which match a common grid, and have different results
+    redundant: List[Tuple[str, str]]  # Recipes which match a common grid, and have the same result. The second is never reached for those grids
+
+
+def knapping_mask(pattern: Sequence[str]) -> Tuple[int, int, int]:
+    """ Compiles a pattern into (width, height, 25-bit mask), with bit (row * 5 + column) set for each remaining ('X') slot """
+    height, width = len(pattern), len(pattern[0])
+    assert 0 < height <= KNAPPING_SIZE and 0 < width <= KNAPPING_SIZE, 'Incorrect size: %s' % pattern
+    mask = 0
+    for row, line in enumerate(pattern):
+        assert len(line) == width, 'Rows must have equal length: %s' % pattern
+        for column, c in enumerate(line):
+            if c != ' ':
+                mask |= 1 << (row * KNAPPING_SIZE + column)
+    return width, height, mask
+
+
+def mirror_mask(width: int, height: int, mask: int) -> int:
+    mirrored = 0
+    for row in range(height):
+        for column in range(width):
+            if mask & (1 << (row * KNAPPING_SIZE + column)):
+                mirrored |= 1 << (row * KNAPPING_SIZE + width - 1 - column)
+    return mirrored
+
+
+def trim_pattern(pattern: Sequence[str]) -> List[str]:
+    """ Removes empty (all ' ') border rows and columns. An empty pattern is left as it is. """
+    rows = [row for row, line in enumerate(pattern) if line.strip(' ')]
+    columns = [column for column in range(len(pattern[0])) if any(line[column] != ' ' for line in pattern)]
+    if not rows:
+        return list(pattern)
+    return [line[columns[0]:columns[-1] + 1] for line in pattern[rows[0]:rows[-1] + 1]]
+
+
+def knapping_grids(pattern: Sequence[str], outside_slot_required: bool) -> FrozenSet[int]:
+    """
+    Every 5x5 grid a pattern matches. As TFC does, the pattern and its horizontal mirror are tried at each offset which fits in the grid, and every slot outside the pattern must be present if outside_slot_required, and removed otherwise.
+    Without outside_slot_required, empty border rows and columns are indistinguishable from outside slots, so the pattern is trimmed first and also matches at the offsets its padding took up.
+    """
+    if not outside_slot_required:
+        pattern = trim_pattern(pattern)
+    width, height, mask = knapping_mask(pattern)
+    region = knapping_mask(['X' * width] * height)[2]
+    grids = set()
+    for placed in {mask, mirror_mask(width, height, mask)}:
+        for dy in range(KNAPPING_SIZE - height + 1):
+            for dx in range(KNAPPING_SIZE - width + 1):
+                shift = dy * KNAPPING_SIZE + dx
+                grids.add(placed << shift | (FULL_GRID & ~(region << shift) if outside_slot_required else 0))
+    return frozenset(grids)
+
+
+class KnappingIndex:
+    """ Knapping recipes indexed by knapping type and every grid they match. Each recipe adds at most 50 grids, so checking n recipes is O(n). """
+
+    def __init__(self):
+        self.grids: Dict[str, Dict[int, KnappingRecipe]] = {}
+        self.conflicts: List[Tuple[str, str]] = []
+        self.redundant: List[Tuple[str, str]] = []
+
+    def add(self, recipe: KnappingRecipe):
+        grids = self.grids.setdefault(recipe.knapping_type, {})
+        overlapping: Dict[str, KnappingRecipe] = {}
+        for grid in sorted(recipe.grids):
+            existing = grids.setdefault(grid, recipe)
+            if existing is not recipe:
+                overlapping.setdefault(existing.id, existing)
+        for existing in overlapping.values():
+            (self.redundant if existing.result == recipe.result else self.conflicts).append((existing.id, recipe.id))
+
+    def report(self) -> KnappingReport:
+        return KnappingReport(self.conflicts, self.redundant)
+
+
+def knapping_recipe_entry(recipe_id: str, data: Dict[str, Any]) -> KnappingRecipe:
+    return KnappingRecipe(recipe_id, data['knapping_type'], knapping_grids(data['pattern'], data.get('outside_slot_required', True)), json.dumps(data['result'], sort_keys=True))
+
+
+def load_knapping_index(rm: ResourceManager) -> KnappingIndex:
+    """ Indexes every generated tfc:knapping recipe """
+    index = KnappingIndex()
+    for path, data in sorted(load_resources(rm).items()):
+        pack_type, namespace, resource = path[:-len('.json')].split('/', 2)
+        if pack_type == 'data' and resource.startswith('recipes/') and data.get('type') == 'tfc:knapping':
+            index.add(knapping_recipe_entry('%s:%s' % (namespace, resource[len('recipes/'):]), data))
+    return index
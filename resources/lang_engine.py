@@ -0,0 +1,161 @@
+import filecmp
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from mcresources import ResourceManager
+
+from alcs_funcs import lang
+
+
+class LangEntry(NamedTuple):
+    template: Optional[str]  # A key into the locale's templates, or None for a literal value
+    args: Tuple[str, ...]  # Words to substitute into the template, or the (default locale) literal value
+
+
+class Locale(NamedTuple):
+    templates: Dict[str, str]  # Template name -> format string, i.e. 'bucket': 'Poisoned {0} Bucket'
+    words: Dict[str, str]  # Registry name -> translated word. Missing words fall back to the fallback locale
+    literals: Dict[str, str]  # Lang key -> translated value, for entries which are not built from a template
+    fallback: Optional[str] = None
+
+
+DEFAULT_LOCALE = 'en_us'
+
+LOCALES: Dict[str, Locale] = {
+    'en_us': Locale({
+        'name': '{0}',
+        'aged': 'Aged {0}',
+        'dead': 'Dead {0}',
+        'wild': 'Wild {0}',
+        'cooked': 'Cooked {0}',
+        'seeds': '{0} Seeds',
+        'powder': '{0} Powder',
+        'bucket': 'Poisoned {0} Bucket',
+        'aged_bucket': 'Poisoned Aged {0} Bucket',
+    }, {}, {}),
+    'de_de': Locale({
+        'name': '{0}',
+        'aged': '{0} (gereift)',
+        'dead': '{0} (verdorrt)',
+        'wild': '{0} (wild)',
+        'cooked': '{0} (gekocht)',
+        'seeds': '{0}-Samen',
+        'powder': '{0}-Pulver',
+        'bucket': 'Eimer mit vergiftetem {0}',
+        'aged_bucket': 'Eimer mit vergiftetem, gereiftem {0}',
+    }, {
+        'hemlock': 'Schierling',
+        'beer': 'Bier',
+        'cider': 'Cider',
+        'rum': 'Rum',
+        'sake': 'Sake',
+        'vodka': 'Wodka',
+        'whiskey': 'Whiskey',
+        'corn_whiskey': 'Maiswhiskey',
+        'rye_whiskey': 'Roggenwhiskey',
+        'red_wine': 'Rotwein',
+        'white_wine': 'Weißwein',
+        'rose_wine': 'Roséwein',
+        'sparkling_wine': 'Schaumwein',
+        'dessert_wine': 'Dessertwein',
+        'water': 'Wasser',
+    }, {
+        'death.attack.vomiting': '%1$s hat sich zu Tode erbrochen',
+        'death.attack.wither': '%1$s starb an Gewebeschäden',
+        'death.attack.wither.player': '%1$s starb im Kampf gegen %2$s an Gewebeschäden',
+        'effect.minecraft.wither': 'Bauchschmerzen',
+    }, DEFAULT_LOCALE),
+}
+
+
+@lru_cache(maxsize=None)
+def default_word(name: str) -> str:
+    """ The title cased form of a registry name, shared by every table and locale """
+    return lang(name)
+
+
+class LangTable:
+    """ A deduplicated table of lang keys, built once and rendered into any number of locales. """
+
+    def __init__(self, locales: Dict[str, Locale] = None, default_locale: str = DEFAULT_LOCALE):
+        self.locales = LOCALES if locales is None else locales
+        self.default_locale = default_locale
+        self.entries: Dict[str, LangEntry] = {}
+        self.conflicts: List[Tuple[str, str, str]] = []  # (key, kept value, rejected value), in the default locale
+
+    def add(self, key: str, template: str, *args: str):
+        self.put(key, LangEntry(template, args))
+
+    def literal(self, key: str, value: str):
+        self.put(key, LangEntry(None, (value,)))
+
+    def put(self, key: str, entry: LangEntry):
+        if key not in self.entries:
+            self.entries[key] = entry
+            return
+        existing = self.entries[key]
+        if existing != entry:
+            kept, rejected = self.render(self.default_locale, existing), self.render(self.default_locale, entry)
+            if kept != rejected:
+                self.conflicts.append((key, kept, rejected))
+
+    def merge(self, rm: ResourceManager):
+        """ Moves all lang entries buffered in the resource manager into this table, so they are written once by the table instead. """
+        for key, value in rm.lang_buffer.pop(self.default_locale, {}).items():
+            self.literal(key, value)
+
+    def render(self, locale: str, entry: LangEntry, key: Optional[str] = None) -> str:
+        loc = self.locales[locale]
+        if entry.template is None:
+            if key is not None and key in loc.literals:
+                return loc.literals[key]
+            return entry.args[0] if loc.fallback is None else self.render(loc.fallback, entry, key)
+        template = loc.templates.get(entry.template)
+        if template is None:
+            fallback = loc.fallback or (self.default_locale if locale != self.default_locale else None)
+            if fallback is None:
+                raise ValueError('No lang template \'%s\' in locale %s, for key %s' % (entry.template, locale, key))
+            return self.render(fallback, entry, key)
+        return template.format(*(self.word(locale, arg) for arg in entry.args))
+
+    def word(self, locale: str, name: str) -> str:
+        loc = self.locales[locale]
+        if name in loc.words:
+            return loc.words[name]
+        if loc.fallback is not None:
+            return self.word(loc.fallback, name)
+        return default_word(name)
+
+    def sorted_keys(self) -> List[str]:
+        return sorted(self.entries)
+
+    def report_conflicts(self):
+        for key, kept, rejected in self.conflicts:
+            print('Conflicting lang values for \'%s\': kept \'%s\', ignored \'%s\'' % (key, kept, rejected))
+
+    def write_locale(self, rm: ResourceManager, locale: str, keys: List[str]) -> str:
+        # Streams the lang file to disk, in the same layout mcresources would produce, and only replaces the existing file if it changed
+        path = os.path.join(*rm.resource_dir, 'assets', rm.domain, 'lang', locale + '.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + '.tmp', 'w', encoding='utf-8') as file:
+            file.write('{\n%s"__comment__": "This file was automatically created by mcresources"' % (' ' * rm.indent))
+            for key in keys:
+                value = self.render(locale, self.entries[key], key)
+                file.write(',\n%s%s: %s' % (' ' * rm.indent, json.dumps(key, ensure_ascii=rm.ensure_ascii), json.dumps(value, ensure_ascii=rm.ensure_ascii)))
+            file.write('\n}')
+        if os.path.isfile(path) and filecmp.cmp(path, path + '.tmp', shallow=False):
+            os.remove(path + '.tmp')
+        else:
+            os.replace(path + '.tmp', path)
+        return path
+
+    def flush(self, rm: ResourceManager):
+        self.merge(rm)
+        self.report_conflicts()
+        keys = self.sorted_keys()
+        with ThreadPoolExecutor(max_workers=min(len(self.locales), os.cpu_count() or 1)) as pool:
+            for _ in pool.map(lambda locale: self.write_locale(rm, locale, keys), self.locales):
+                pass
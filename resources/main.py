@@ -1,10 +1,28 @@
+import argparse
+
 from mcresources import ResourceManager
+import alcs_funcs
 from alcs_funcs import *
+from lang_engine import LangTable
+from bundles import remove_bundles, write_bundles
+from climate_index import ClimateIndex, climate_bands, envelopes
+from dead_assets import find_dead_assets, remove_dead_assets
+from knapping import load_knapping_index
+from model_dedup import dedupe_models
+from placement_order import order_placements
+from recipe_sim import check_overlaps, load_recipes
+from references import dangling_references
+from textures import optimize_textures, similar_textures
+from tags import flatten_tags, referenced_tags
+from validation import validate_output
+from worldgen_cost import worldgen_costs
+from worldgen_sim import patch_parameters, read_placed_feature_tag, simulate_density
 
 
 CROPS: Dict[str, Crop] = {
     'hemlock': Crop('default', 5, 'potassium', 3, 30, 100, 400, 25, 100, None, None)
 }
+WILD_CROP_WEIGHTS: Dict[str, float] = {}  # Crop -> relative chance of being picked within a merged wild crop patch, defaulting to 1
 POISONED_ALCOHOLS = ['poisoned_' + alcohol for alcohol in ALCOHOLS]
 POISONED_ALCOHOLS.extend(['poisoned_aged_' + alcohol for alcohol in ALCOHOLS])
 POISONED_ALCOHOLS.append('poisoned_water')
@@ -12,8 +30,25 @@ POISONED_ALCOHOLS.append('poisoned_water')
 WINES = [wine + '_wine' for wine in ('red', 'white', 'rose', 'sparkling', 'dessert')]
 POISONED_WINES = ['poisoned_' + wine for wine in WINES]
 
+# Namespace -> mod id, for mods which are optional dependencies. Resources referencing these are only loaded when the mod is present
+OPTIONAL_MODS: Dict[str, str] = {
+    'firmalife': 'firmalife',
+    'tfcagedalcohol': 'tfcagedalcohol'
+}
+
+WORLDGEN_BUDGET = 10  # Estimated cost per chunk of all our placed features, in a climate where every feature can generate. See worldgen_cost.py
+
+# Source fluid -> poisoned fluid
+POISONABLE_FLUIDS: Dict[str, str] = {
+    **dict((f'tfc:{alcohol}', f'poisoned_drinks:poisoned_{alcohol}') for alcohol in ALCOHOLS),
+    **dict((f'tfcagedalcohol:aged_{alcohol}', f'poisoned_drinks:poisoned_aged_{alcohol}') for alcohol in ALCOHOLS),
+    **dict((f'firmalife:{wine}', f'poisoned_drinks:poisoned_{wine}') for wine in WINES),
+    'minecraft:water': 'poisoned_drinks:poisoned_water'
+}
+
 
 rm = ResourceManager('poisoned_drinks')
+lang_table = LangTable()
 
 def generate_crops():
     print('Generating general crop stuff...')
@@ -21,7 +56,6 @@ def generate_crops():
         name = f'poisoned_drinks:food/{crop}'
         if crop_data.type == 'default':
             block = rm.blockstate(('crop', crop), variants=dict((f'age={i}', {'model': f'poisoned_drinks:block/crop/{crop}_age_{i}'}) for i in range(crop_data.stages)))
-            block.with_lang(lang(crop))
             for i in range(crop_data.stages):
                 rm.block_model(('crop', f'{crop}_age_{i}'), textures={'crop': f'poisoned_drinks:block/crop/{crop}_{i}'}, parent='block/crop')
                 
@@ -39,7 +73,6 @@ def generate_crops():
             'mature=false': {'model': f'poisoned_drinks:block/dead_crop/{crop}_young'}
         })
         
-        block.with_lang(lang(f'dead {crop}'))
         rm.block_model(('dead_crop', f'{crop}_young'), textures={'crop': f'poisoned_drinks:block/crop/{crop}_dead_young'}, parent='block/crop')
         rm.block_model(('dead_crop', f'{crop}'), textures={'crop': f'poisoned_drinks:block/crop/{crop}_dead'}, parent='block/crop')
         
@@ -52,7 +85,7 @@ def generate_crops():
             'conditions': loot_tables.block_state_property(f'poisoned_drinks:dead_crop/{crop}[mature=false]')
         }))
         
-        block = rm.block(('wild_crop', crop)).with_lang(lang(f'Wild {crop}'))
+        block = rm.block(('wild_crop', crop))
         block.with_block_model(textures={'crop': f'poisoned_drinks:block/crop/{crop}_wild'}, parent='tfc:block/wild_crop/crop')
         rm.item_model(('wild_crop', crop), parent=f'poisoned_drinks:block/wild_crop/{crop}', no_textures=True)
         
@@ -65,7 +98,7 @@ def generate_crops():
             'name': f'poisoned_drinks:seeds/{crop}'
         })
         
-        rm.item_model(('seeds', crop)).with_lang(lang('%s seeds', crop)).with_tag('tfc:seeds')
+        rm.item_model(('seeds', crop)).with_tag('tfc:seeds')
         
         climate_range(rm, 'crop/hemlock', (25, 100, 0), (3, 30, 5))
         
@@ -85,9 +118,9 @@ def generate_block_models():
 
 def generate_item_models():
     print('\tGenerating item models...')
-    rm.item_model(('food', 'hemlock'), 'poisoned_drinks:item/food/hemlock').with_lang('Hemlock')
-    rm.item_model(('food', 'cooked_hemlock'), 'poisoned_drinks:item/food/cooked_hemlock').with_lang('Cooked Hemlock')
-    rm.item_model(('powder', 'hemlock'), 'poisoned_drinks:item/powder/hemlock').with_lang('Hemlock Powder')
+    rm.item_model(('food', 'hemlock'), 'poisoned_drinks:item/food/hemlock')
+    rm.item_model(('food', 'cooked_hemlock'), 'poisoned_drinks:item/food/cooked_hemlock')
+    rm.item_model(('powder', 'hemlock'), 'poisoned_drinks:item/powder/hemlock')
     
     
 def generate_models():
@@ -104,148 +137,50 @@ def generate_heats():
     print('Generating heats...')
     item_heat(rm, ('food', 'hemlock'), 'poisoned_drinks:food/hemlock', 1.0)
 
-def generate_misc_lang():
-    print('Generating misc lang...')
+def generate_lang():
+    print('Generating lang...')
+    for crop in CROPS:
+        lang_table.add(f'block.poisoned_drinks.crop.{crop}', 'name', crop)
+        lang_table.add(f'block.poisoned_drinks.dead_crop.{crop}', 'dead', crop)
+        lang_table.add(f'block.poisoned_drinks.wild_crop.{crop}', 'wild', crop)
+        lang_table.add(f'item.poisoned_drinks.seeds.{crop}', 'seeds', crop)
+        lang_table.add(f'item.poisoned_drinks.food.{crop}', 'name', crop)
+        lang_table.add(f'item.poisoned_drinks.food.cooked_{crop}', 'cooked', crop)
+        lang_table.add(f'item.poisoned_drinks.powder.{crop}', 'powder', crop)
+    
     for alcohol in ALCOHOLS:
-        rm.lang(f'fluid.poisoned_drinks.poisoned_{alcohol}', lang(alcohol))
-        rm.lang(f'item.poisoned_drinks.bucket.poisoned_{alcohol}', lang(f'Poisoned {alcohol} bucket'))
-        rm.lang(f'block.poisoned_drinks.fluid.poisoned_{alcohol}', lang(alcohol))
-        rm.lang(f'fluid.poisoned_drinks.poisoned_aged_{alcohol}', lang(f'Aged {alcohol}'))
-        rm.lang(f'item.poisoned_drinks.bucket.poisoned_aged_{alcohol}', lang(f'Poisoned Aged {alcohol} bucket'))
-        rm.lang(f'block.poisoned_drinks.fluid.poisoned_aged_{alcohol}', lang(f'Aged {alcohol}'))
+        lang_table.add(f'fluid.poisoned_drinks.poisoned_{alcohol}', 'name', alcohol)
+        lang_table.add(f'item.poisoned_drinks.bucket.poisoned_{alcohol}', 'bucket', alcohol)
+        lang_table.add(f'block.poisoned_drinks.fluid.poisoned_{alcohol}', 'name', alcohol)
+        lang_table.add(f'fluid.poisoned_drinks.poisoned_aged_{alcohol}', 'aged', alcohol)
+        lang_table.add(f'item.poisoned_drinks.bucket.poisoned_aged_{alcohol}', 'aged_bucket', alcohol)
+        lang_table.add(f'block.poisoned_drinks.fluid.poisoned_aged_{alcohol}', 'aged', alcohol)
     
     for wine in WINES:
-        rm.lang(f'fluid.poisoned_drinks.poisoned_{wine}', lang(wine))
-        rm.lang(f'item.poisoned_drinks.bucket.poisoned_{wine}', lang(f'Poisoned {wine} bucket'))
-        rm.lang(f'block.poisoned_drinks.fluid.poisoned_{wine}', lang(wine))
+        lang_table.add(f'fluid.poisoned_drinks.poisoned_{wine}', 'name', wine)
+        lang_table.add(f'item.poisoned_drinks.bucket.poisoned_{wine}', 'bucket', wine)
+        lang_table.add(f'block.poisoned_drinks.fluid.poisoned_{wine}', 'name', wine)
     
-    rm.lang('fluid.poisoned_drinks.poisoned_water', 'Water')
-    rm.lang('item.poisoned_drinks.bucket.poisoned_water', 'Poisoned Water Bucket')
-    rm.lang('block.poisoned_drinks.poisoned_water', 'Water')
-    rm.lang('death.attack.vomiting', '%1$s vomited to death')
-    rm.lang('death.attack.wither', '%1$s died of tissue damage')
-    rm.lang('death.attack.wither.player', '%1$s died of tissue damage whilst fighting %2$s')
-    rm.lang('effect.minecraft.wither', 'Stomachache')
+    lang_table.add('fluid.poisoned_drinks.poisoned_water', 'name', 'water')
+    lang_table.add('item.poisoned_drinks.bucket.poisoned_water', 'bucket', 'water')
+    lang_table.add('block.poisoned_drinks.poisoned_water', 'name', 'water')
+    lang_table.literal('death.attack.vomiting', '%1$s vomited to death')
+    lang_table.literal('death.attack.wither', '%1$s died of tissue damage')
+    lang_table.literal('death.attack.wither.player', '%1$s died of tissue damage whilst fighting %2$s')
+    lang_table.literal('effect.minecraft.wither', 'Stomachache')
     
 def generate_crafting_recipes():
-
-    for i in range(1, 5 + 1):
-        write_crafting_recipe(
-            rm, ('crafting', 'poison', f'water_{i}'),
-            {
-                'type': 'tfc:no_remainder_shapeless_crafting',
-                'recipe': {
-                    'type': 'tfc:advanced_shapeless_crafting',
-                    'ingredients': utils.ingredient_list((fluid_item_ingredient('100 minecraft:water'), *(['poisoned_drinks:powder/hemlock'] * i))),
-                    'result': {'modifiers': [{'type': 'poisoned_drinks:modify_fluid', 'fluid': {'fluid': 'poisoned_drinks:poisoned_water', 'amount': i * 400}}]},
-                    'primary_ingredient': fluid_item_ingredient('100 minecraft:water')
-                }
-            }
-        )
-        write_crafting_recipe(
-            rm, ('crafting', 'poison', f'poisoned_water_{i}'),
-            {
-                'type': 'tfc:no_remainder_shapeless_crafting',
-                'recipe': {
-                    'type': 'tfc:advanced_shapeless_crafting',
-                    'ingredients': utils.ingredient_list((fluid_item_ingredient('100 poisoned_drinks:poisoned_water'), *(['poisoned_drinks:powder/hemlock'] * i))),
-                    'result': {'modifiers': [{'type': 'poisoned_drinks:modify_fluid', 'fluid': {'fluid': 'poisoned_drinks:poisoned_water', 'amount': i * 400}}]},
-                    'primary_ingredient': fluid_item_ingredient('100 poisoned_drinks:poisoned_water')
-                }
-            }
-        )
-        for alcohol in ALCOHOLS:
-            write_crafting_recipe(
-                rm, ('crafting', 'poison', f'{alcohol}_{i}'),
-                {
-                    'type': 'tfc:no_remainder_shapeless_crafting',
-                    'recipe': {
-                        'type': 'tfc:advanced_shapeless_crafting',
-                        'ingredients': utils.ingredient_list((fluid_item_ingredient(f'100 tfc:{alcohol}'), *(['poisoned_drinks:powder/hemlock'] * i))),
-                        'result': {'modifiers': [{'type': 'poisoned_drinks:modify_fluid', 'fluid': {'fluid': f'poisoned_drinks:poisoned_{alcohol}', 'amount': i * 400}}]},
-                        'primary_ingredient': fluid_item_ingredient(f'100 tfc:{alcohol}')
-                    }
-                }
-            )
-            write_crafting_recipe(
-                rm, ('crafting', 'poison', f'aged_{alcohol}_{i}'),
-                {
-                    'type': 'tfc:no_remainder_shapeless_crafting',
-                    'recipe': {
-                        'type': 'tfc:advanced_shapeless_crafting',
-                        'ingredients': utils.ingredient_list((fluid_item_ingredient(f'100 tfcagedalcohol:aged_{alcohol}'), *(['poisoned_drinks:powder/hemlock'] * i))),
-                        'result': {'modifiers': [{'type': 'poisoned_drinks:modify_fluid', 'fluid': {'fluid': f'poisoned_drinks:poisoned_aged_{alcohol}', 'amount': i * 400}}]}, # TODO: FIX THIS
-                        'primary_ingredient': fluid_item_ingredient(f'100 tfcagedalcohol:aged_{alcohol}')
-                    }
-                }
-            )
-            write_crafting_recipe(
-                rm, ('crafting', 'poison', f'poisoned_{alcohol}_{i}'),
-                {
-                    'type': 'tfc:no_remainder_shapeless_crafting',
-                    'recipe': {
-                        'type': 'tfc:advanced_shapeless_crafting',
-                        'ingredients': utils.ingredient_list((fluid_item_ingredient(f'100 poisoned_drinks:poisoned_{alcohol}'), *(['poisoned_drinks:powder/hemlock'] * i))),
-                        'result': {'modifiers': [{'type': 'poisoned_drinks:modify_fluid', 'fluid': {'fluid': f'poisoned_drinks:poisoned_{alcohol}', 'amount': i * 400}}]},
-                        'primary_ingredient': fluid_item_ingredient(f'100 poisoned_drinks:poisoned_{alcohol}')
-                    }
-                }
-            )
-            write_crafting_recipe(
-                rm, ('crafting', 'poison', f'poisoned_aged_{alcohol}_{i}'),
-                {
-                    'type': 'tfc:no_remainder_shapeless_crafting',
-                    'recipe': {
-                        'type': 'tfc:advanced_shapeless_crafting',
-                        'ingredients': utils.ingredient_list((fluid_item_ingredient(f'100 poisoned_drinks:poisoned_aged_{alcohol}'), *(['poisoned_drinks:powder/hemlock'] * i))),
-                        'result': {'modifiers': [{'type': 'poisoned_drinks:modify_fluid', 'fluid': {'fluid': f'poisoned_drinks:poisoned_aged_{alcohol}', 'amount': i * 400}}]}, # TODO: FIX THIS
-                        'primary_ingredient': fluid_item_ingredient(f'100 poisoned_drinks:poisoned_aged_{alcohol}')
-                    }
-                }
-            )
-        for wine in WINES:
-            write_crafting_recipe(
-                rm, ('crafting', 'poison', f'{wine}_{i}'),
-                {
-                    'type': 'tfc:no_remainder_shapeless_crafting',
-                    'recipe': {
-                        'type': 'tfc:advanced_shapeless_crafting',
-                        'ingredients': utils.ingredient_list((fluid_item_ingredient(f'100 firmalife:{wine}'), *(['poisoned_drinks:powder/hemlock'] * i))),
-                        'result': {'modifiers': [{'type': 'poisoned_drinks:modify_fluid', 'fluid': {'fluid': f'poisoned_drinks:poisoned_{wine}', 'amount': i * 400}}]},
-                        'primary_ingredient': fluid_item_ingredient(f'100 firmalife:{wine}')
-                    }
-                }
-            )
-            write_crafting_recipe(
-                rm, ('crafting', 'poison', f'poisoned_{wine}_{i}'),
-                {
-                    'type': 'tfc:no_remainder_shapeless_crafting',
-                    'recipe': {
-                        'type': 'tfc:advanced_shapeless_crafting',
-                        'ingredients': utils.ingredient_list((fluid_item_ingredient(f'100 poisoned_drinks:poisoned_{wine}'), *(['poisoned_drinks:powder/hemlock'] * i))),
-                        'result': {'modifiers': [{'type': 'poisoned_drinks:modify_fluid', 'fluid': {'fluid': f'poisoned_drinks:poisoned_{wine}', 'amount': i * 400}}]},
-                        'primary_ingredient': fluid_item_ingredient(f'100 poisoned_drinks:poisoned_{wine}')
-                    }
-                }
-            )
+    print('\tGenerating crafting recipes...')
+    # Poisoned fluids can be poisoned again, which only increases the amount of poison
+    fluids = {**POISONABLE_FLUIDS, **dict((poisoned, poisoned) for poisoned in POISONABLE_FLUIDS.values())}
+    for mod, mod_fluids in split_by_mod(fluids, OPTIONAL_MODS).items():
+        poisoning_recipe(rm, ('crafting', join_not_empty('_', 'poisoning', mod or '')), 'poisoned_drinks:powder/hemlock', mod_fluids, amount_per_poison=400, max_poisons=5, min_amount=100, conditions=mod_conditions(mod_fluids, OPTIONAL_MODS))
     
 
 def generate_instant_barrel_recipes():
     print('\tGenerating instant barrel recipes...')
-    for alcohol in ALCOHOLS:
-        barrel_instant_recipe(rm, ('poison', alcohol), 'poisoned_drinks:powder/hemlock', f'400 tfc:{alcohol}', None, f'400 poisoned_drinks:poisoned_{alcohol}')
-        barrel_instant_recipe(rm, ('poison', f'aged_{alcohol}'), 'poisoned_drinks:powder/hemlock', f'400 tfcagedalcohol:aged_{alcohol}', None, f'400 poisoned_drinks:poisoned_aged_{alcohol}')
-    for wine in WINES:
-        barrel_instant_recipe(rm, ('poison', wine), 'poisoned_drinks:powder/hemlock', f'400 firmalife:{wine}', None, f'400 poisoned_drinks:poisoned_{wine}')
-    barrel_instant_recipe(rm, ('poison', 'water'), 'poisoned_drinks:powder/hemlock', '400 minecraft:water', None, '400 poisoned_drinks:poisoned_water')
-    
-    # for alcohol in ALCOHOLS:
-    #     barrel_instant_recipe(rm, ('poison', f'poisoned_{alcohol}'), 'poisoned_drinks:powder/hemlock', f'400 poisoned_drinks:poisoned_{alcohol}', None, None)
-    #     barrel_instant_recipe(rm, ('poison', f'poisoned_aged_{alcohol}'), 'poisoned_drinks:powder/hemlock', f'400 poisoned_drinks:poisoned_aged_{alcohol}', None, None)
-    # for wine in WINES:
-    #     barrel_instant_recipe(rm, ('poison', f'poisoned_{wine}'), 'poisoned_drinks:powder/hemlock', f'400 poisoned_drinks:poisoned_{wine}', None, None)
-    # barrel_instant_recipe(rm, ('poison', 'poisoned_water'), 'poisoned_drinks:powder/hemlock', '400 poisoned_drinks:poisoned_water', None, None)
-    # 
+    for mod, mod_fluids in split_by_mod(POISONABLE_FLUIDS, OPTIONAL_MODS).items():
+        barrel_poisoning_recipe(rm, join_not_empty('_', 'poisoning', mod or ''), 'poisoned_drinks:powder/hemlock', '400 #poisoned_drinks:poisonable', mod_fluids, conditions=mod_conditions(mod_fluids, OPTIONAL_MODS))
     
 def generate_heat_recipes():
     print('\tGenerating heat recipes...')
@@ -265,6 +200,7 @@ def generate_recipes():
 def generate_fluid_tags():
     print('\tGenerating fluid tags...')
     rm.fluid_tag(('poisons'), *POISONED_ALCOHOLS, *POISONED_WINES)
+    rm.fluid_tag('poisonable', *({'id': fluid, 'required': False} if required_mods(fluid, OPTIONAL_MODS) else fluid for fluid in POISONABLE_FLUIDS))
     rm.fluid_tag('industrial_fluids', 'tfc:lye', 'tfc:limewater', 'tfc:tannin')
     rm.fluid_tag('tfc:drinkables', '#poisoned_drinks:poisons', '#poisoned_drinks:industrial_fluids')
     
@@ -273,13 +209,14 @@ def generate_tags():
     generate_fluid_tags()
     
 
-def generate_worldgen():
+def generate_worldgen(merge_wild_crops: bool):
     print('Generating worldgen...')
     for crop, crop_data in CROPS.items():
         name_parts = ('crop', 'wild_crop', crop)
         name = f'poisoned_drinks:wild_crop/{crop}'
         heightmap: Heightmap = 'world_surface_wg'
         replaceable = decorate_replaceable()
+        climate = decorate_climate(crop_data.min_temp, crop_data.max_temp, crop_data.min_rain, crop_data.max_rain, min_forest=crop_data.min_forest, max_forest=crop_data.max_forest)
         
         feature = 'simple_block', {'to_place': simple_state_provider(name)}
         
@@ -287,27 +224,156 @@ def generate_worldgen():
         patch_feature = res.join() + '_patch'
         singular_feature = utils.resource_location(rm.domain, name_parts)
         
+        rm.configured_feature(singular_feature, *feature)
+        if merge_wild_crops:
+            rm.placed_feature(singular_feature, singular_feature, climate, decorate_heightmap(heightmap), replaceable, decorate_would_survive(name))
+            continue
+
         rm.placed_feature_tag('tfc:feature/crops', patch_feature)
         
         rm.configured_feature(patch_feature, 'minecraft:random_patch', {'tries': 6, 'xz_spread': 5, 'y_spread': 1, 'feature': singular_feature.join()})
-        rm.configured_feature(singular_feature, *feature)
-        rm.placed_feature(patch_feature, patch_feature, decorate_chance(80), decorate_square(), decorate_climate(crop_data.min_temp, crop_data.max_temp, crop_data.min_rain, crop_data.max_rain, min_forest=crop_data.min_forest, max_forest=crop_data.max_forest))
+        rm.placed_feature(patch_feature, patch_feature, decorate_chance(80), decorate_square(), climate)
         rm.placed_feature(singular_feature, singular_feature, decorate_heightmap(heightmap), replaceable, decorate_would_survive(name))
-        
-        
-        
+
+    if merge_wild_crops:
+        generate_wild_crop_bands()
+
+
+def generate_wild_crop_bands():
+    """
+    One patch feature per band of wild crops with overlapping climates, instead of one per crop. Each try picks a crop by weight, and the crop's own placed feature checks its climate.
+    The band's chance is scaled by the number of crops in it, so with equal weights each crop gets the same expected tries per chunk as a patch of its own.
+    """
+    for i, band in enumerate(climate_bands(envelopes('crop', CROPS))):
+        band_feature = 'poisoned_drinks:crop/wild_crop/band_%d_patch' % i
+        crops = [entry.name for entry in band]
+        weights = [WILD_CROP_WEIGHTS.get(crop, 1) for crop in crops]
+        # random_selector tries each feature in turn with its chance, so feature i is chosen with probability weight_i / sum(weights)
+        selector = {
+            'features': [{'feature': 'poisoned_drinks:crop/wild_crop/%s' % crop, 'chance': weight / sum(weights[j:])} for j, (crop, weight) in enumerate(zip(crops[:-1], weights))],
+            'default': 'poisoned_drinks:crop/wild_crop/%s' % crops[-1]
+        }
+        rm.placed_feature_tag('tfc:feature/crops', band_feature)
+        rm.configured_feature(band_feature, 'minecraft:random_patch', {'tries': 6, 'xz_spread': 5, 'y_spread': 1, 'feature': {'feature': {'type': 'minecraft:random_selector', 'config': selector}, 'placement': []}})
+        rm.placed_feature(band_feature, band_feature, decorate_chance(max(1, round(80 / len(crops)))), decorate_square(), decorate_climate(min(e.min_temp for e in band), max(e.max_temp for e in band), min(e.min_rain for e in band), max(e.max_rain for e in band)))
+
+
+def report_climates():
+    print('Checking crop climates...')
+    index = ClimateIndex(envelopes('crop', CROPS) + envelopes('tfc_crop', alcs_funcs.CROPS))
+    coverage, overlaps = index.coverage(), index.overlaps()
+    for crop in CROPS:
+        shared = sorted(b.name for a, b in overlaps if a.kind == 'crop' and a.name == crop and b.kind == 'tfc_crop')
+        print('\t%s grows in %.0f%% of climates, alone in %.0f%%, alongside %d TFC crops: %s' % (crop, 100 * coverage.coverage['crop/' + crop], 100 * coverage.exclusive['crop/' + crop], len(shared), ', '.join(shared)))
+
+
+def report_worldgen_density():
+    print('Simulating wild crop density...')
+    for patch in read_placed_feature_tag(rm, 'tfc:feature/crops'):
+        report = simulate_density(patch_parameters(rm, patch))
+        print('\t%s: %.4f crops per chunk [%.4f, %.4f] in suitable climates, %.2f crops per patch, over %d chunks' % (patch, *report.crops_per_chunk, report.crops_per_patch.mean, report.chunks))
+        for band in report.bands:
+            if band.per_chunk.mean > 0:
+                print('\t\ttemperature %g to %g, rainfall %g to %g: %.4f [%.4f, %.4f]' % (*band.temp, *band.rain, *band.per_chunk))
+
 
 def main():
+    parser = argparse.ArgumentParser(description='Generate resources for Poisoned Drinks')
+    parser.add_argument('--release', action='store_true', dest='release', help='Flatten tags into their leaf entries, dropping tags which are only referenced by other tags')
+    parser.add_argument('--bundle', action='store_true', dest='bundle', help='Pack all generated resources into one bundle file per registry, which the mod expands at runtime')
+    parser.add_argument('--prune-assets', action='store_true', dest='prune_assets', help='Remove models and textures which are not referenced by any blockstate or item model, instead of only reporting them')
+    parser.add_argument('--simulate-worldgen', action='store_true', dest='simulate_worldgen', help='Estimate wild crop density per chunk and per climate band from the generated features')
+    parser.add_argument('--worldgen-budget', type=float, default=WORLDGEN_BUDGET, dest='worldgen_budget', help='Fail when the estimated per chunk cost of our placed features exceeds this')
+    parser.add_argument('--merge-wild-crops', action='store_true', dest='merge_wild_crops', help='Generate one wild crop patch feature per climate band, instead of one per crop')
+    args = parser.parse_args()
+
     generate_crops()
     generate_food()
     generate_heats()
     generate_models()
     generate_drinks()
-    generate_misc_lang()
+    generate_lang()
     generate_recipes()
     generate_tags()
-    generate_worldgen()
+    generate_worldgen(args.merge_wild_crops)
+    report_climates()
+    if args.release:
+        # After all other resources are written, so every tag they reference is kept
+        dropped = flatten_tags(rm, 'fluids', referenced_tags(rm))
+        print('Flattened fluid tags, dropped %d intermediate tags' % len(dropped))
     
+    lang_table.flush(rm)
     rm.flush()
 
-main()
\ No newline at end of file
+    print('Deduplicating models...')
+    removed, reduced = dedupe_models(rm)
+    print('\tShared %d block models, reduced %d item models to parents' % (removed, reduced))
+
+    print('Ordering placement modifiers...')
+    for reorder in order_placements(rm):
+        print('\t%s: %s -> %s' % (reorder.feature, ', '.join(reorder.before), ', '.join(reorder.after)))
+
+    if args.simulate_worldgen:
+        report_worldgen_density()
+
+    print('Checking for unreferenced assets...')
+    dead_models, dead_textures = find_dead_assets(rm)
+    for name in dead_models + dead_textures:
+        print('\t%s %s' % ('Removing' if args.prune_assets else 'Unreferenced:', name))
+    if args.prune_assets:
+        remove_dead_assets(rm, dead_models, dead_textures)
+
+    print('Optimizing textures...')
+    results = optimize_textures(rm)
+    saved = sum(result.old_size - result.new_size for result in results)
+    print('\tRecompressed %d of %d textures, saving %d bytes' % (sum(result.new_size < result.old_size for result in results), len(results), saved))
+    for first, second, differences in similar_textures(rm):
+        print('\t%s textures: %s and %s' % ('Identical' if differences == 0 else 'Near identical (%d pixels differ)' % differences, first, second))
+
+    print('Validating resources...')
+    errors = validate_output(rm)
+    for error in errors:
+        print('\t' + error)
+    if errors:
+        raise ValueError('%d errors in generated resources' % len(errors))
+
+    print('Resolving references...')
+    dangling = dangling_references(rm)
+    for reference in dangling:
+        print('\tUnknown %s \'%s\' referenced by %s' % (reference.kind.replace('_', ' '), reference.id, reference.source))
+    if dangling:
+        raise ValueError('%d dangling references in generated resources' % len(dangling))
+
+    print('Estimating worldgen cost...')
+    costs = worldgen_costs(rm)
+    for cost in costs:
+        print('\t%s: %.3f per chunk, %.3f in a suitable climate, %.4f placements' % cost)
+    worst = sum(cost.worst for cost in costs)
+    print('\tTotal: %.3f per chunk, %.3f in a climate where every feature generates, budget %g' % (sum(cost.expected for cost in costs), worst, args.worldgen_budget))
+    if worst > args.worldgen_budget:
+        raise ValueError('Estimated worldgen cost %.3f per chunk exceeds the budget of %g' % (worst, args.worldgen_budget))
+
+    print('Simulating recipe lookup...')
+    recipes = load_recipes(rm)
+    for kind in ('crafting', 'barrel'):
+        total = sum(recipe.kind == kind for recipe in recipes.recipes)
+        print('\t%d %s recipes, %d index keys' % (total, kind, sum(key[0] == kind for key in recipes.index)))
+    check_overlaps(recipes)
+    for first, second in recipes.overlaps():
+        print('\tAmbiguous recipes: %s and %s can match the same input' % (first, second))
+    knapping = load_knapping_index(rm).report()
+    for first, second in knapping.conflicts:
+        print('\tConflicting knapping patterns: %s and %s can match the same grid and have different results' % (first, second))
+    for first, second in knapping.redundant:
+        print('\tRedundant knapping recipe: %s duplicates %s' % (second, first))
+
+    if args.bundle:
+        print('Bundling resources...')
+        for bundle, count in write_bundles(rm).items():
+            print('\t%s: %d resources' % (bundle, count))
+    else:
+        remove_bundles(rm)
+
+
+if __name__ == '__main__':
+    main()
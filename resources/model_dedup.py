@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Tuple
+
+from mcresources import ResourceManager
+
+
+SHARED_MODEL_PATH = 'shared'
+
+
+def resource_id(ref: str) -> str:
+    return ref if ':' in ref else 'minecraft:' + ref
+
+
+def model_structure(model: Dict[str, Any]) -> str:
+    return json.dumps({k: v for k, v in model.items() if k != '__comment__'}, sort_keys=True)
+
+
+def load_json_tree(root: str) -> Dict[str, Dict[str, Any]]:
+    """ Loads every json file below root, keyed by the path relative to root, without the extension """
+    tree = {}
+    for directory, _, files in os.walk(root):
+        for file in files:
+            if file.endswith('.json'):
+                path = os.path.join(directory, file)
+                with open(path, 'r', encoding='utf-8') as f:
+                    tree[os.path.relpath(path, root)[:-5].replace(os.sep, '/')] = json.load(f)
+    return tree
+
+
+def blockstate_model_refs(blockstate: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """ Every object in a blockstate with a 'model' key, which are the objects to retarget when a model is replaced """
+    cases = list(blockstate.get('variants', {}).values()) + [part['apply'] for part in blockstate.get('multipart', ())]
+    return [model for case in cases for model in (case if isinstance(case, list) else [case])]
+
+
+def dedupe_models(rm: ResourceManager) -> Tuple[int, int]:
+    """
+    Collapses block models with identical structure into one auto-generated shared model under block/shared/, retargeting every blockstate and parent reference to it and removing the originals.
+    Item models cannot be removed, as they are looked up by item id, so identical item models are reduced to a parent reference instead.
+    Models using a custom loader are left alone, as loader parameters are not inherited.
+    Shared models which are still needed are left in place, so a regeneration with no duplicates to collapse changes no files.
+    Returns the number of (removed block models, reduced item models).
+    """
+    assets = os.path.join(*rm.resource_dir, 'assets', rm.domain)
+    shared_prefix = '%s:block/%s/' % (rm.domain, SHARED_MODEL_PATH)
+
+    blockstates = load_json_tree(os.path.join(assets, 'blockstates'))
+    models = {'%s:%s' % (rm.domain, path): model for path, model in load_json_tree(os.path.join(assets, 'models')).items()}
+    stale_shared = {name for name in models if name.startswith(shared_prefix)}
+    models = {name: model for name, model in models.items() if name not in stale_shared}
+
+    groups: Dict[str, List[str]] = {}
+    for name, model in models.items():
+        if 'loader' not in model:
+            groups.setdefault(model_structure(model), []).append(name)
+
+    replacements: Dict[str, str] = {}
+    for structure, names in groups.items():
+        blocks = sorted(name for name in names if name.startswith(rm.domain + ':block/'))
+        if len(blocks) > 1:
+            shared = 'block/%s/%s' % (SHARED_MODEL_PATH, hashlib.sha1(structure.encode('utf-8')).hexdigest()[:8])
+            rm.write((*rm.resource_dir, 'assets', rm.domain, 'models', shared), json.loads(structure))
+            stale_shared.discard('%s:%s' % (rm.domain, shared))
+            for name in blocks:
+                replacements[name] = '%s:%s' % (rm.domain, shared)
+
+    for path, blockstate in blockstates.items():
+        refs = [ref for ref in blockstate_model_refs(blockstate) if resource_id(ref['model']) in replacements]
+        for ref in refs:
+            ref['model'] = replacements[resource_id(ref['model'])]
+        if refs:
+            rm.write((*rm.resource_dir, 'assets', rm.domain, 'blockstates', path), blockstate)
+
+    reduced = 0
+    for name, model in models.items():
+        path = name.split(':', 1)[1]
+        if name in replacements:
+            os.remove(os.path.join(assets, 'models', path + '.json'))
+        elif 'parent' in model and resource_id(model['parent']) in replacements:
+            rm.write((*rm.resource_dir, 'assets', rm.domain, 'models', path), {**model, 'parent': replacements[resource_id(model['parent'])]})
+        elif path.startswith('item/') and 'loader' not in model:
+            blocks = [block for block in groups[model_structure(model)] if block in replacements]
+            if blocks:
+                rm.write((*rm.resource_dir, 'assets', rm.domain, 'models', path), {'parent': replacements[blocks[0]]})
+                reduced += 1
+    for name in stale_shared:
+        os.remove(os.path.join(assets, 'models', name.split(':', 1)[1] + '.json'))
+    return len(replacements), reduced
@@ -0,0 +1,239 @@
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+from PIL import Image
+
+DOUBLE_MULTIPLIER = float(np.float32(1.110223E-16))  # As BitRandomSource, a float constant which is not quite 2^-53
+INPUT_FACTOR = 1.0181268882175227  # NormalNoise samples its second perlin noise at this scale
+ROUND_OFF = 3.3554432E7  # PerlinNoise.wrap
+GRADIENTS = np.array([
+    (1, 1, 0), (-1, 1, 0), (1, -1, 0), (-1, -1, 0), (1, 0, 1), (-1, 0, 1), (1, 0, -1), (-1, 0, -1),
+    (0, 1, 1), (0, -1, 1), (0, 1, -1), (0, -1, -1), (1, 1, 0), (0, -1, 1), (-1, 1, 0), (0, -1, -1)
+], dtype=np.float64)
+PALETTE = np.array([(86, 160, 72), (214, 190, 70), (180, 90, 160), (70, 140, 200), (220, 110, 60), (150, 150, 150)], dtype=np.float64)
+
+
+def java_int(value: int) -> int:
+    value &= 0xFFFFFFFF
+    return value - (1 << 32) if value >= 1 << 31 else value
+
+
+def java_long(value: int) -> int:
+    value &= 0xFFFFFFFFFFFFFFFF
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def java_string_hash(text: str) -> int:
+    value = 0
+    for c in text:
+        value = (31 * value + ord(c)) & 0xFFFFFFFF
+    return java_int(value)
+
+
+class LegacyRandom:
+    """ LegacyRandomSource, the java.util.Random generator which noise providers are seeded with """
+
+    def __init__(self, seed: int):
+        self.seed = (seed ^ 0x5DEECE66D) & ((1 << 48) - 1)
+
+    def next(self, bits: int) -> int:
+        self.seed = (self.seed * 0x5DEECE66D + 0xB) & ((1 << 48) - 1)
+        return java_int(self.seed >> (48 - bits))
+
+    def next_int(self, bound: int) -> int:
+        if bound & -bound == bound:
+            return (bound * self.next(31)) >> 31
+        while True:
+            i = self.next(31)
+            j = i % bound
+            if java_int(i - j + bound - 1) >= 0:
+                return j
+
+    def next_long(self) -> int:
+        return java_long((self.next(32) << 32) + self.next(32))
+
+    def next_double(self) -> float:
+        return ((self.next(26) << 27) + self.next(27)) * DOUBLE_MULTIPLIER
+
+    def fork_positional(self) -> Callable[[str], 'LegacyRandom']:
+        seed = self.next_long()
+        return lambda name: LegacyRandom(java_string_hash(name) ^ seed)
+
+
+class ImprovedNoise(NamedTuple):
+    xo: float
+    yo: float
+    zo: float
+    p: np.ndarray  # Permutation of 0 - 255, repeated twice so sums of two hashes need no wrapping
+    gradients: np.ndarray  # (3, 512), the components of the gradient for each hash in p
+
+
+class PerlinNoise(NamedTuple):
+    levels: List[Optional[ImprovedNoise]]
+    amplitudes: List[float]
+    input_factor: float  # Of the lowest frequency octave
+    value_factor: float
+
+
+class NormalNoise(NamedTuple):
+    first: PerlinNoise
+    second: PerlinNoise
+    value_factor: float
+
+
+def improved_noise(random: LegacyRandom) -> ImprovedNoise:
+    xo, yo, zo = random.next_double() * 256, random.next_double() * 256, random.next_double() * 256
+    p = list(range(256))
+    for i in range(256):
+        j = random.next_int(256 - i)
+        p[i], p[i + j] = p[i + j], p[i]
+    p = np.array(p + p, dtype=np.int64)
+    return ImprovedNoise(xo, yo, zo, p, np.ascontiguousarray(GRADIENTS[p & 15].T))
+
+
+def perlin_noise(random: LegacyRandom, first_octave: int, amplitudes: Sequence[float]) -> PerlinNoise:
+    """ PerlinNoise.create, with each octave seeded from a positional fork of `random` """
+    octave = random.fork_positional()
+    levels = [improved_noise(octave('octave_%d' % (first_octave + i))) if amplitude != 0 else None for i, amplitude in enumerate(amplitudes)]
+    return PerlinNoise(levels, list(amplitudes), 2.0 ** first_octave, 2.0 ** (len(amplitudes) - 1) / (2.0 ** len(amplitudes) - 1))
+
+
+def normal_noise(seed: int, parameters: Dict[str, Any]) -> NormalNoise:
+    """ NormalNoise.create(new WorldgenRandom(new LegacyRandomSource(seed)), parameters), as built by noise based state providers """
+    random = LegacyRandom(seed)
+    first_octave, amplitudes = parameters['firstOctave'], parameters['amplitudes']
+    first, second = perlin_noise(random, first_octave, amplitudes), perlin_noise(random, first_octave, amplitudes)
+    octaves = [i for i, amplitude in enumerate(amplitudes) if amplitude != 0]
+    return NormalNoise(first, second, (1 / 6) / (0.1 * (1 + 1 / (max(octaves) - min(octaves) + 1))))
+
+
+def smoothstep(t: np.ndarray) -> np.ndarray:
+    return t * t * t * (t * (t * 6 - 15) + 10)
+
+
+def lerp(t: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a + t * (b - a)
+
+
+def sample_improved(noise: ImprovedNoise, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    """ ImprovedNoise.noise. Coordinates broadcast against each other, so a grid can be sampled from a row of x and a column of z, with the hashing done per row and column. """
+    x, y, z = x + noise.xo, y + noise.yo, z + noise.zo
+    fx, fy, fz = np.floor(x), np.floor(y), np.floor(z)
+    i, j, k = fx.astype(np.int64) & 255, fy.astype(np.int64) & 255, fz.astype(np.int64) & 255
+    x, y, z = x - fx, y - fy, z - fz
+    p, gx, gy, gz = noise.p, *noise.gradients
+
+    def grad(index: np.ndarray, dx: np.ndarray, dy: np.ndarray, dz: np.ndarray) -> np.ndarray:
+        return np.take(gx, index) * dx + np.take(gy, index) * dy + np.take(gz, index) * dz
+
+    a, b = p[i], p[i + 1]
+    aa, ab, ba, bb = p[a + j], p[a + j + 1], p[b + j], p[b + j + 1]
+    sx, sy, sz = smoothstep(x), smoothstep(y), smoothstep(z)
+    near = lerp(sy, lerp(sx, grad(aa + k, x, y, z), grad(ba + k, x - 1, y, z)), lerp(sx, grad(ab + k, x, y - 1, z), grad(bb + k, x - 1, y - 1, z)))
+    far = lerp(sy, lerp(sx, grad(aa + k + 1, x, y, z - 1), grad(ba + k + 1, x - 1, y, z - 1)), lerp(sx, grad(ab + k + 1, x, y - 1, z - 1), grad(bb + k + 1, x - 1, y - 1, z - 1)))
+    return lerp(sz, near, far)
+
+
+def wrap(value: np.ndarray) -> np.ndarray:
+    return value - np.floor(value / ROUND_OFF + 0.5) * ROUND_OFF
+
+
+def sample_perlin(noise: PerlinNoise, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    value, input_factor, value_factor = np.zeros(np.broadcast(x, y, z).shape), noise.input_factor, noise.value_factor
+    for level, amplitude in zip(noise.levels, noise.amplitudes):
+        if level is not None:
+            value += amplitude * value_factor * sample_improved(level, wrap(x * input_factor), wrap(y * input_factor), wrap(z * input_factor))
+        input_factor, value_factor = input_factor * 2, value_factor / 2
+    return value
+
+
+def sample_normal(noise: NormalNoise, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+    return (sample_perlin(noise.first, x, y, z) + sample_perlin(noise.second, x * INPUT_FACTOR, y * INPUT_FACTOR, z * INPUT_FACTOR)) * noise.value_factor
+
+
+def state_index(value: np.ndarray, count: Any) -> np.ndarray:
+    """ NoiseBasedStateProvider.getRandomState: the index into a list of `count` states picked by a noise value """
+    return np.clip(np.trunc((1 + value) / 2 * count), 0, np.maximum(count - 1, 0)).astype(np.int64)
+
+
+def provider_sampler(provider: Dict[str, Any]) -> Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+    """
+    A vectorized block position -> (state index, main noise value) sampler for a minecraft:noise_provider or minecraft:dual_noise_provider.
+    Returns a function of integer block coordinates giving an array of shape (2, ...).
+    """
+    noise, scale, states = normal_noise(provider['seed'], provider['noise']), provider['scale'], len(provider['states'])
+    if provider['type'] in ('noise_provider', 'minecraft:noise_provider'):
+        def sample(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+            value = sample_normal(noise, x * scale, y * scale, z * scale)
+            return np.stack([state_index(value, states), value])
+        return sample
+
+    assert provider['type'] in ('dual_noise_provider', 'minecraft:dual_noise_provider'), 'Not a noise provider: %s' % provider['type']
+    slow, slow_scale = normal_noise(provider['seed'], provider['slow_noise']), provider['slow_scale']
+    variety = provider['variety'] if isinstance(provider['variety'], list) else [provider['variety']] * 2
+
+    def sample_dual(x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+        slow_value = sample_normal(slow, x * slow_scale, y * slow_scale, z * slow_scale)
+        count = np.trunc(variety[0] + np.clip((slow_value + 1) / 2, 0, 1) * (variety[1] + 1 - variety[0])).astype(np.int64)
+        # The list of candidate states, each picked by the slow noise at an offset position. Later candidates are only sampled if some position uses them
+        candidates = [state_index(slow_value, states)] + [
+            state_index(sample_normal(slow, (x + i * 54545) * slow_scale, y * slow_scale, (z + i * 34234) * slow_scale), states) if (count > i).any() else np.zeros_like(count)
+            for i in range(1, variety[1] + 1)
+        ]
+        candidates = np.stack(np.broadcast_arrays(*candidates))
+        value = sample_normal(noise, x * scale, y * scale, z * scale)
+        return np.stack([np.take_along_axis(candidates, state_index(value, count)[np.newaxis], 0)[0], value])
+    return sample_dual
+
+
+def render_preview(provider: Dict[str, Any], x: int, z: int, size: int, y: int = 64, workers: int = None, rows_per_task: int = 64) -> Image.Image:
+    """
+    Renders a `size` x `size` block area with its corner at (x, z), one pixel per block. The hue is the state the provider picks, and the brightness the main noise value.
+    Bands of rows are sampled in parallel, numpy releases the GIL for the bulk of the work.
+    """
+    sample = provider_sampler(provider)
+    xs = np.arange(x, x + size, dtype=np.float64)
+
+    def band(start: int) -> np.ndarray:
+        zs = np.arange(z + start, z + min(start + rows_per_task, size), dtype=np.float64)
+        return sample(xs[np.newaxis, :], np.full((1, 1), y, dtype=np.float64), zs[:, np.newaxis])
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        indices, values = np.concatenate(list(pool.map(band, range(0, size, rows_per_task))), axis=1)
+    shade = (0.35 + 0.65 * np.clip((values + 1) / 2, 0, 1))[..., np.newaxis]
+    return Image.fromarray((PALETTE[indices.astype(np.int64) % len(PALETTE)] * shade).astype(np.uint8), 'RGB')
+
+
+def read_provider(resource_dir: str, feature: str) -> Dict[str, Any]:
+    """ The to_place state provider of a generated configured simple_block feature """
+    domain, path = feature.split(':', 1)
+    with open(os.path.join(resource_dir, 'data', domain, 'worldgen', 'configured_feature', path + '.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)['config']['to_place']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render a preview of the blocks a noise state provider picks')
+    parser.add_argument('output', help='PNG file to write')
+    parser.add_argument('--feature', help='A generated configured feature to read the provider from. Defaults to the provider used by configured_noise_plant_feature')
+    parser.add_argument('--resource-dir', default=os.path.join('src', 'main', 'resources'), dest='resource_dir')
+    parser.add_argument('--x', type=int, default=0)
+    parser.add_argument('--z', type=int, default=0)
+    parser.add_argument('--y', type=int, default=64)
+    parser.add_argument('--size', type=int, default=1024)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.feature is not None:
+        provider = read_provider(args.resource_dir, args.feature)
+    else:
+        from alcs_funcs import noise_plant_state_provider
+        provider = noise_plant_state_provider('minecraft:grass')
+    render_preview(provider, args.x, args.z, args.size, args.y, args.workers).save(args.output)
+
+
+if __name__ == '__main__':
+    main()
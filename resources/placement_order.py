@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, NamedTuple, Sequence
+
+from mcresources import ResourceManager
+
+from model_dedup import resource_id
+from validation import load_resources
+from worldgen_cost import modifier_cost
+
+# Modifiers which keep or drop a position without moving it or producing more. Any other modifier is a barrier which filters are never moved across.
+FILTER_MODIFIERS = (
+    'minecraft:rarity_filter', 'minecraft:block_predicate_filter', 'tfc:climate', 'tfc:biome', 'tfc:shallow_water', 'tfc:flat_enough',
+    'tfc:underground', 'tfc:near_fluid', 'tfc:on_top', 'tfc:no_solid_neighbors'
+)
+
+
+class Reorder(NamedTuple):
+    feature: str
+    before: List[str]
+    after: List[str]
+
+
+def modifier_name(modifier: Any) -> str:
+    if isinstance(modifier, str):
+        return resource_id(modifier)
+    if resource_id(modifier['type']) == 'minecraft:block_predicate_filter':
+        return resource_id(modifier['predicate']['type'])
+    return resource_id(modifier['type'])
+
+
+def is_filter(modifier: Any) -> bool:
+    return resource_id(modifier if isinstance(modifier, str) else modifier['type']) in FILTER_MODIFIERS
+
+
+def rank(modifier: Any) -> float:
+    """ Cost per position rejected. Running filters in increasing rank minimizes the expected cost of a run of independent filters. """
+    cost, rate, _ = modifier_cost(modifier, True)
+    return cost / (1 - rate) if rate < 1 else float('inf')
+
+
+def order_placement(placement: Sequence[Any]) -> List[Any]:
+    """ Sorts each run of consecutive filters by rank, keeping the original order for ties. Filters never move past a modifier which changes positions. """
+    ordered, run = [], []
+    for modifier in list(placement) + [None]:
+        if modifier is not None and is_filter(modifier):
+            run.append(modifier)
+        else:
+            ordered += sorted(run, key=rank)
+            run = []
+            if modifier is not None:
+                ordered.append(modifier)
+    return ordered
+
+
+def order_placements(rm: ResourceManager) -> List[Reorder]:
+    """ Rewrites every generated placed feature, inline placed features included, with its filters in cheapest first order """
+    reorders = []
+
+    def visit(data: Any, feature: str) -> Any:
+        if isinstance(data, list):
+            return [visit(value, feature) for value in data]
+        if isinstance(data, dict):
+            data = {key: visit(value, feature) for key, value in data.items()}
+            if isinstance(data.get('placement'), list) and 'feature' in data:
+                ordered = order_placement(data['placement'])
+                if ordered != data['placement']:
+                    reorders.append(Reorder(feature, [modifier_name(m) for m in data['placement']], [modifier_name(m) for m in ordered]))
+                    data['placement'] = ordered
+        return data
+
+    for path, data in sorted(load_resources(rm).items()):
+        pack_type, namespace, resource = path[:-len('.json')].split('/', 2)
+        if pack_type == 'data' and resource.startswith('worldgen/'):
+            count = len(reorders)
+            data = visit(data, '%s:%s' % (namespace, resource.split('/', 2)[-1]))
+            if len(reorders) > count:
+                rm.write((*rm.resource_dir, path[:-len('.json')]), data)
+    return reorders
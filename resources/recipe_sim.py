@@ -0,0 +1,325 @@
+import itertools
+from typing import Any, Callable, Collection, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from mcresources import ResourceManager
+
+from model_dedup import resource_id
+from tags import expand_tag
+from validation import load_resources
+
+
+class Slot(NamedTuple):
+    item: str
+    count: int = 1
+    fluid: Optional[str] = None  # The fluid held by a fluid container item
+    amount: int = 0
+
+
+class Barrel(NamedTuple):
+    item: Optional[Slot]
+    fluid: Optional[str]
+    amount: int = 0
+
+
+class Requirement(NamedTuple):
+    alternatives: FrozenSet[str]  # Item ids, or '#tag' for tags which could not be resolved. Fluid requirements hold fluid ids
+    fluid: bool = False  # If this is a fluid, held in a container (crafting) or the tank (barrel)
+    count: int = 1  # Items, or the fluid amount
+
+
+class SimRecipe(NamedTuple):
+    id: str
+    kind: str  # 'crafting' or 'barrel'
+    requirements: Tuple[Requirement, ...]  # The first requirement is the anchor the recipe is indexed by
+    max_counts: Tuple[int, ...]  # How many slots each requirement can take
+    matches: Callable[[Any], bool]
+
+
+class MatchResult(NamedTuple):
+    matches: List[str]
+    scanned: int  # Candidates tested using the index
+    total: int  # Recipes of this kind, which a linear scan (as the recipe manager does) would test
+
+
+CRAFTING_TYPES = ('minecraft:crafting_shaped', 'minecraft:crafting_shapeless', 'tfc:advanced_shaped_crafting', 'tfc:advanced_shapeless_crafting', 'poisoned_drinks:poisoning')
+BARREL_TYPES = ('tfc:barrel_instant', 'tfc:barrel_sealed', 'poisoned_drinks:barrel_poisoning')
+
+
+class RecipeIndex:
+    """ An offline model of crafting and barrel recipe lookup, with recipes indexed by the item or fluid ids of their anchor requirement. """
+
+    def __init__(self, recipes: Sequence[SimRecipe]):
+        self.recipes = list(recipes)
+        self.index: Dict[Tuple[str, str], List[SimRecipe]] = {}
+        for recipe in self.recipes:
+            for key in (recipe.requirements[0].alternatives if recipe.requirements else ()):
+                self.index.setdefault((recipe.kind, key), []).append(recipe)
+
+    def candidates(self, kind: str, keys: Set[str]) -> List[SimRecipe]:
+        seen, found = set(), []
+        for key in sorted(keys):
+            for recipe in self.index.get((kind, key), ()):
+                if recipe.id not in seen:
+                    seen.add(recipe.id)
+                    found.append(recipe)
+        return found
+
+    def simulate(self, kind: str, state: Any) -> MatchResult:
+        candidates = self.candidates(kind, state_keys(state))
+        return MatchResult([recipe.id for recipe in candidates if recipe.matches(state)], len(candidates), sum(recipe.kind == kind for recipe in self.recipes))
+
+    def simulate_grid(self, grid: Sequence[Optional[Slot]]) -> MatchResult:
+        return self.simulate('crafting', [slot for slot in grid if slot is not None])
+
+    def simulate_barrel(self, barrel: Barrel) -> MatchResult:
+        return self.simulate('barrel', barrel)
+
+    def overlaps(self) -> List[Tuple[str, str]]:
+        """ Pairs of recipes of the same kind which both match at least one state, found by building a witness state for every pair which could share one. """
+        by_key: Dict[Tuple[str, str], List[SimRecipe]] = {}
+        for recipe in self.recipes:
+            for key in {key for requirement in recipe.requirements for key in requirement.alternatives}:
+                by_key.setdefault((recipe.kind, key), []).append(recipe)
+        candidates = {(first, second) for bucket in by_key.values() for i, first in enumerate(bucket) for second in bucket[i + 1:]}
+        # Barrel recipes ignore an item or fluid they do not use, so one without an item can share a state with one without a fluid
+        barrels = [recipe for recipe in self.recipes if recipe.kind == 'barrel']
+        candidates |= {(first, second) for i, first in enumerate(barrels) for second in barrels[i + 1:] if {r.fluid for r in first.requirements}.isdisjoint(r.fluid for r in second.requirements)}
+        pairs = set()
+        for first, second in candidates:
+            state = witness(first, second)
+            if state is not None and first.matches(state) and second.matches(state):
+                pairs.add(tuple(sorted((first.id, second.id))))
+        return sorted(pairs)
+
+
+def state_keys(state: Any) -> Set[str]:
+    slots = [state.item] if isinstance(state, Barrel) else state
+    keys = {slot.item for slot in slots if slot is not None} | {slot.fluid for slot in slots if slot is not None and slot.fluid is not None}
+    if isinstance(state, Barrel) and state.fluid is not None:
+        keys.add(state.fluid)
+    return keys
+
+
+def augment(i: int, edges: Callable[[int], Sequence[int]], pairing: Dict[int, int], visited: Set[int], optional: Collection[int] = ()) -> bool:
+    """
+    Finds an augmenting path from left vertex i, re-pairing right vertices along it. `pairing` maps each paired right vertex to its left vertex.
+    Paired right vertices stay paired. Paired left vertices stay paired too, except those in `optional`, which may give up their right vertex to end the path.
+    """
+    for j in edges(i):
+        if j not in visited:
+            visited.add(j)
+            if j not in pairing or pairing[j] in optional or augment(pairing[j], edges, pairing, visited, optional):
+                pairing[j] = i
+                return True
+    return False
+
+
+def copies(requirements: Sequence[Requirement], max_counts: Sequence[int]) -> Tuple[List[int], List[int]]:
+    """ One copy of each requirement per slot it can take, by requirement index, and the copies which must be filled. """
+    copied = [i for i, requirement in enumerate(requirements) for _ in range(max_counts[i])]
+    return copied, [n for n, i in enumerate(copied) if n - copied.index(i) < (1 if requirements[i].fluid else requirements[i].count)]
+
+
+def witness(first: SimRecipe, second: SimRecipe) -> Optional[Any]:
+    """ A state which both recipes match, or None if there is none. """
+    if first.kind == 'barrel':
+        return barrel_witness(first, second)
+    first_copies, first_required = copies(first.requirements, first.max_counts)
+    second_copies, second_required = copies(second.requirements, second.max_counts)
+
+    def shared(n: int, m: int) -> FrozenSet[str]:
+        a, b = first.requirements[first_copies[n]], second.requirements[second_copies[m]]
+        return a.alternatives & b.alternatives if a.fluid == b.fluid else frozenset()
+
+    # Each slot is consumed by one copy in either recipe, so a state is a pairing of first copies with second copies which fills the required copies of both.
+    # Pair the required first copies, then the required second copies. Augmenting keeps every paired first copy paired, and may only unpair optional second copies.
+    second_of: Dict[int, int] = {}
+    if not all(augment(n, lambda n: [m for m in range(len(second_copies)) if shared(n, m)], second_of, set()) for n in first_required):
+        return None
+    first_of = {n: m for m, n in second_of.items()}
+    optional = set(range(len(second_copies))) - set(second_required)
+    if not all(m in first_of.values() or augment(m, lambda m: [n for n in range(len(first_copies)) if shared(n, m)], first_of, set(), optional) for m in second_required):
+        return None
+    slots = []
+    for n, m in sorted(first_of.items()):
+        a, b = first.requirements[first_copies[n]], second.requirements[second_copies[m]]
+        key = min(shared(n, m))
+        slots.append(Slot('container', 1, key, max(a.count, b.count)) if a.fluid else Slot(key))
+    return slots
+
+
+def barrel_witness(first: SimRecipe, second: SimRecipe) -> Optional[Barrel]:
+    """ A barrel holds one item and one fluid. Requirements of only one recipe are filled from its own alternatives, as the other recipe ignores them. """
+    held = []
+    for fluid in (False, True):
+        found = [requirement for requirement in first.requirements + second.requirements if requirement.fluid == fluid]
+        alternatives = frozenset.intersection(*(requirement.alternatives for requirement in found)) if found else frozenset()
+        if found and not alternatives:
+            return None
+        held.append((min(alternatives), max(requirement.count for requirement in found)) if found else None)
+    item, fluid = held
+    return Barrel(Slot(*item) if item is not None else None, *(fluid if fluid is not None else (None, 0)))
+
+
+def brute_force_overlaps(index: RecipeIndex, max_slots: int = 9) -> List[Tuple[str, str]]:
+    """
+    The overlapping pairs found by simulating every state of up to `max_slots` crafting slots, and every barrel.
+    Keys accepted by the same requirements are interchangeable, so one key of each such class is tried, with the largest count or amount any requirement asks for.
+    """
+    pairs = set()
+    for kind in ('crafting', 'barrel'):
+        requirements = [requirement for recipe in index.recipes if recipe.kind == kind for requirement in recipe.requirements]
+        keys: Dict[bool, List[Tuple[str, int]]] = {}
+        for fluid in (False, True):
+            classes: Dict[FrozenSet[int], str] = {}
+            for key in sorted({key for requirement in requirements if requirement.fluid == fluid for key in requirement.alternatives}):
+                classes.setdefault(frozenset(n for n, requirement in enumerate(requirements) if requirement.fluid == fluid and key in requirement.alternatives), key)
+            count = max((requirement.count for requirement in requirements if requirement.fluid == fluid), default=1)
+            keys[fluid] = [(key, count) for key in classes.values()]
+        if kind == 'crafting':
+            alphabet = [Slot(key) for key, _ in keys[False]] + [Slot('container', 1, key, amount) for key, amount in keys[True]]
+            results = [index.simulate_grid(grid) for size in range(1, max_slots + 1) for grid in itertools.combinations_with_replacement(alphabet, size)]
+        else:
+            results = [index.simulate_barrel(Barrel(item, *fluid)) for item in [None] + [Slot(*key) for key in keys[False]] for fluid in [(None, 0)] + keys[True]]
+        for result in results:
+            pairs |= set(itertools.combinations(sorted(result.matches), 2))
+    return sorted(pairs)
+
+
+def item_requirement(ingredient: Any, item_tags: Dict[str, Set[str]], count: int = 1) -> Requirement:
+    alternatives = set()
+    for entry in ingredient if isinstance(ingredient, list) else [ingredient]:
+        if 'ingredient' in entry:
+            alternatives |= item_requirement(entry['ingredient'], item_tags).alternatives
+        elif 'item' in entry:
+            alternatives.add(resource_id(entry['item']))
+        elif 'tag' in entry:
+            alternatives |= item_tags.get(resource_id(entry['tag']), {'#' + resource_id(entry['tag'])})
+    return Requirement(frozenset(alternatives), False, count)
+
+
+def fluid_requirement(ingredient: Any, fluid_tags: Dict[str, Set[str]], amount: int) -> Requirement:
+    alternatives = set()
+    for entry in ingredient if isinstance(ingredient, list) else [ingredient]:
+        if isinstance(entry, str):
+            alternatives.add(resource_id(entry))
+        elif 'fluid' in entry:
+            alternatives.add(resource_id(entry['fluid']))
+        elif 'tag' in entry:
+            alternatives |= fluid_tags.get(resource_id(entry['tag']), {'#' + resource_id(entry['tag'])})
+    return Requirement(frozenset(alternatives), True, amount)
+
+
+def crafting_matcher(requirements: Sequence[Requirement], max_counts: Sequence[int]) -> Callable[[List[Slot]], bool]:
+    """
+    Shapeless matching: every slot is consumed by exactly one requirement, and each requirement is satisfied between count and max_count times. Shaped recipes are treated as shapeless.
+    As alternatives may overlap, slots are assigned by bipartite matching against copies of each requirement, as the recipe manager does, rather than to the first requirement they fit.
+    """
+    copied, required = copies(requirements, max_counts)
+
+    def accepts(slot: Slot, requirement: Requirement) -> bool:
+        held = slot.fluid if requirement.fluid else slot.item
+        return held in requirement.alternatives and (not requirement.fluid or slot.amount >= requirement.count)
+
+    def matches(grid: List[Slot]) -> bool:
+        if not len(required) <= len(grid) <= len(copied):
+            return False
+        # Pair every required copy with a slot, then every slot with a copy. Augmenting keeps the required copies paired.
+        copy_of: Dict[int, int] = {}
+        if not all(augment(n, lambda n: [k for k, slot in enumerate(grid) if accepts(slot, requirements[copied[n]])], copy_of, set()) for n in required):
+            return False
+        slot_of = {n: k for k, n in copy_of.items()}
+        return all(k in copy_of or augment(k, lambda k: [n for n, i in enumerate(copied) if accepts(grid[k], requirements[i])], slot_of, set()) for k in range(len(grid)))
+    return matches
+
+
+def barrel_matcher(item: Optional[Requirement], fluid: Optional[Requirement]) -> Callable[[Barrel], bool]:
+    def matches(barrel: Barrel) -> bool:
+        if item is not None and (barrel.item is None or barrel.item.item not in item.alternatives or barrel.item.count < item.count):
+            return False
+        return fluid is None or (barrel.fluid in fluid.alternatives and barrel.amount >= fluid.count)
+    return matches
+
+
+def loaded(data: Dict[str, Any], loaded_mods: Optional[Set[str]]) -> bool:
+    if loaded_mods is None:
+        return True
+    return all(condition.get('type') != 'forge:mod_loaded' or condition['modid'] in loaded_mods for condition in data.get('conditions', ()))
+
+
+def load_recipes(rm: ResourceManager, loaded_mods: Optional[Set[str]] = None) -> RecipeIndex:
+    """ Builds the index from the generated crafting and barrel recipes on disk. With `loaded_mods`, recipes conditional on other mods are skipped. """
+    resources = load_resources(rm)
+    tags: Dict[str, Dict[str, Any]] = {'items': {}, 'fluids': {}}
+    for path, data in resources.items():
+        pack_type, namespace, resource = path[:-len('.json')].split('/', 2)
+        for tag_type in tags:
+            if pack_type == 'data' and resource.startswith('tags/%s/' % tag_type):
+                tags[tag_type]['%s:%s' % (namespace, resource[len('tags/%s/' % tag_type):])] = data['values']
+    item_tags, fluid_tags = ({name: set(expand_tag(values, name)) for name in values} for values in tags.values())
+
+    recipes = []
+    for path, data in sorted(resources.items()):
+        pack_type, namespace, resource = path[:-len('.json')].split('/', 2)
+        if pack_type != 'data' or not resource.startswith('recipes/') or not loaded(data, loaded_mods):
+            continue
+        recipe_id, recipe_type = '%s:%s' % (namespace, resource[len('recipes/'):]), data.get('type')
+        if recipe_type == 'poisoned_drinks:poisoning':
+            requirements = (Requirement(frozenset(resource_id(fluid) for fluid in data['fluids']), True, data.get('min_amount', 1)), item_requirement(data['poison'], item_tags))
+            max_counts = (1, data['max_poisons'])
+            recipes.append(SimRecipe(recipe_id, 'crafting', requirements, max_counts, crafting_matcher(requirements, max_counts)))
+        elif recipe_type in CRAFTING_TYPES:
+            ingredients = data['ingredients'] if 'ingredients' in data else [data['key'][key] for row in data['pattern'] for key in row if key != ' ']
+            requirements = tuple(item_requirement(ingredient, item_tags) for ingredient in ingredients)
+            max_counts = (1,) * len(requirements)
+            recipes.append(SimRecipe(recipe_id, 'crafting', requirements, max_counts, crafting_matcher(requirements, max_counts)))
+        elif recipe_type in BARREL_TYPES:
+            item = item_requirement(data['input_item']['ingredient'], item_tags, data['input_item'].get('count', 1)) if 'input_item' in data else None
+            fluid = fluid_requirement(data['input_fluid']['ingredient'], fluid_tags, data['input_fluid']['amount']) if 'input_fluid' in data else None
+            if fluid is not None and recipe_type == 'poisoned_drinks:barrel_poisoning':
+                # Matched by both the input fluid and the fluid map. Unresolved tags can only be checked against the map
+                mapped = frozenset(resource_id(f) for f in data['fluids'])
+                fluid = Requirement(mapped if any(f.startswith('#') for f in fluid.alternatives) else mapped & fluid.alternatives, True, fluid.count)
+            requirements = tuple(requirement for requirement in (fluid, item) if requirement is not None)
+            recipes.append(SimRecipe(recipe_id, 'barrel', requirements, (1,) * len(requirements), barrel_matcher(item, fluid)))
+    return RecipeIndex(recipes)
+
+
+def check_overlaps(index: RecipeIndex):
+    found, expected = index.overlaps(), brute_force_overlaps(index)
+    assert found == expected, 'Recipe overlaps %s do not match a brute force search: %s' % (found, expected)
+
+
+def example_recipes() -> RecipeIndex:
+    """ Recipes whose overlaps an anchor index or equal requirement counts would miss, and some which must not overlap """
+    x, y, x_or_y = Requirement(frozenset({'x'})), Requirement(frozenset({'y'})), Requirement(frozenset({'x', 'y'}))
+    water, beer = Requirement(frozenset({'minecraft:water'}), True, 100), Requirement(frozenset({'tfc:beer'}), True, 100)
+    hemlock = Requirement(frozenset({'poisoned_drinks:powder/hemlock'}))
+
+    def crafting(recipe_id: str, requirements: Tuple[Requirement, ...], max_counts: Optional[Tuple[int, ...]] = None) -> SimRecipe:
+        max_counts = max_counts or (1,) * len(requirements)
+        return SimRecipe(recipe_id, 'crafting', requirements, max_counts, crafting_matcher(requirements, max_counts))
+
+    def barrel(recipe_id: str, item: Optional[Requirement], fluid: Optional[Requirement]) -> SimRecipe:
+        requirements = tuple(requirement for requirement in (fluid, item) if requirement is not None)
+        return SimRecipe(recipe_id, 'barrel', requirements, (1,) * len(requirements), barrel_matcher(item, fluid))
+
+    return RecipeIndex([
+        crafting('xy', (x, y)),
+        crafting('yx', (y, x)),
+        crafting('x_or_y', (x_or_y,)),
+        crafting('poisoning', (water, hemlock), (1, 5)),
+        crafting('water_and_three_hemlock', (water, hemlock, hemlock, hemlock)),
+        crafting('beer_and_hemlock', (beer, hemlock)),
+        barrel('water', None, water),
+        barrel('x', x, None),
+        barrel('poisoning_water', hemlock, water),
+        barrel('poisoning_beer', hemlock, beer),
+    ])
+
+
+if __name__ == '__main__':
+    index = example_recipes()
+    check_overlaps(index)
+    for pair in index.overlaps():
+        print('%s and %s can match the same input' % pair)
@@ -0,0 +1,137 @@
+import os
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Set, Tuple
+
+from mcresources import ResourceManager
+
+from dead_assets import texture_files
+from model_dedup import resource_id
+from validation import load_resources
+
+
+class Reference(NamedTuple):
+    kind: str  # The registry or resource type, i.e. 'item', 'model', 'fluid_tag'
+    id: str
+    source: str  # The resource path the reference was found in
+
+
+# Registry directory below data/<namespace>/tags/ -> reference kind
+TAG_KINDS = {'items': 'item', 'blocks': 'block', 'fluids': 'fluid', 'worldgen/placed_feature': 'placed_feature'}
+
+# Registrations in the mod's registry classes, of the form REGISTRY.register("prefix/" + value.getId()), or a plain "literal"
+JAVA_REGISTRATION = re.compile(r'(ITEMS|BLOCKS)\.register\("([a-z0-9_/]*)"(?:\s*\+\s*\w+\.(getId|getSerializedName)\(\))?')
+JAVA_REGISTRIES = {'ITEMS': 'item', 'BLOCKS': 'block'}
+
+
+def java_enum_constants(path: str) -> List[str]:
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    body = re.search(r'\benum\s+\w+[^{]*\{(.*?);', source, re.DOTALL).group(1)
+    return re.findall(r'\b([A-Z][A-Z0-9_]*)\s*\(', body)
+
+
+def java_definitions(rm: ResourceManager) -> Set[Tuple[str, str]]:
+    """
+    The items, blocks and fluids registered by the mod, read from the Java enums and registry classes.
+    Enum-driven registrations use PoisonedBeverages.getId() ('poisoned_' + name) and Crop.getSerializedName() (name), matching their Java definitions.
+    """
+    root = os.path.join(*rm.resource_dir, '..', 'java', 'net', 'mrhitech', rm.domain)
+    values = {
+        'getId': ['poisoned_' + name.lower() for name in java_enum_constants(os.path.join(root, 'common', 'PoisonedBeverages.java'))],
+        'getSerializedName': [name.lower() for name in java_enum_constants(os.path.join(root, 'common', 'block', 'crop', 'Crop.java'))],
+    }
+    defined = {('fluid', '%s:%s%s' % (rm.domain, prefix, fluid)) for fluid in values['getId'] for prefix in ('', 'flowing_')}
+    for registry_class in (('common', 'item', 'PoisonedDrinksItems.java'), ('common', 'block', 'PoisonedDrinksBlocks.java')):
+        with open(os.path.join(root, *registry_class), 'r', encoding='utf-8') as f:
+            for registry, prefix, method in JAVA_REGISTRATION.findall(f.read()):
+                for value in (values[method] if method else ('',)):
+                    defined.add((JAVA_REGISTRIES[registry], '%s:%s%s' % (rm.domain, prefix, value)))
+    return defined
+
+
+def resource_definitions(rm: ResourceManager, resources: Dict[str, Any]) -> Set[Tuple[str, str]]:
+    """ Models, textures, tags and worldgen features defined by resource files """
+    defined = set()
+    for path in resources:
+        pack_type, namespace, resource = path[:-len('.json')].split('/', 2)
+        if pack_type == 'assets' and resource.startswith('models/'):
+            defined.add(('model', '%s:%s' % (namespace, resource[len('models/'):])))
+        elif pack_type == 'data':
+            for directory, kind in (('worldgen/configured_feature/', 'configured_feature'), ('worldgen/placed_feature/', 'placed_feature')):
+                if resource.startswith(directory):
+                    defined.add((kind, '%s:%s' % (namespace, resource[len(directory):])))
+            for directory, kind in TAG_KINDS.items():
+                if resource.startswith('tags/%s/' % directory):
+                    defined.add((kind + '_tag', '%s:%s' % (namespace, resource[len('tags/%s/' % directory):])))
+    defined.update(('texture', '%s:%s' % (rm.domain, texture)) for texture in texture_files(os.path.join(*rm.resource_dir, 'assets', rm.domain)))
+    return defined
+
+
+def json_references(data: Any, source: str, fluid: bool = False, feature: str = 'configured_feature') -> Iterator[Reference]:
+    """ References found by key: item, fluid, block and model ids, textures, tags and features. `fluid` is set within fluid ingredients, where tags are fluid tags. """
+    if isinstance(data, list):
+        for value in data:
+            yield from json_references(value, source, fluid, feature)
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, str):
+                if key == 'item' or (key == 'name' and 'type' in data and data['type'] == 'minecraft:item'):
+                    yield Reference('item', resource_id(value), source)
+                elif key == 'fluid' or (key == 'ingredient' and fluid):
+                    yield Reference('fluid', resource_id(value), source)
+                elif key in ('block', 'Name'):
+                    yield Reference('block', resource_id(value), source)
+                elif key in ('model', 'parent'):
+                    yield Reference('model', resource_id(value), source)
+                elif key == 'tag':
+                    yield Reference('fluid_tag' if fluid else 'item_tag', resource_id(value), source)
+                elif key == 'feature':
+                    yield Reference(feature, resource_id(value), source)
+            elif key == 'textures' and isinstance(value, dict):
+                yield from (Reference('texture', resource_id(texture), source) for texture in value.values() if not texture.startswith('#'))
+            elif key == 'fluids' and isinstance(value, dict):
+                for input_fluid, output_fluid in value.items():
+                    yield Reference('fluid', resource_id(input_fluid), source)
+                    yield Reference('fluid', resource_id(output_fluid), source)
+            elif key == 'config':
+                yield from json_references(value, source, fluid, 'placed_feature')
+            else:
+                yield from json_references(value, source, fluid or key in ('input_fluid', 'output_fluid', 'result_fluid'), feature)
+
+
+def resource_references(path: str, data: Any) -> Iterator[Reference]:
+    pack_type, namespace, resource = path[:-len('.json')].split('/', 2)
+    if pack_type == 'assets':
+        if resource.startswith('blockstates/'):
+            yield Reference('block', '%s:%s' % (namespace, resource[len('blockstates/'):]), path)
+        elif resource.startswith('models/item/'):
+            yield Reference('item', '%s:%s' % (namespace, resource[len('models/item/'):]), path)
+        if not resource.startswith('lang/'):
+            yield from json_references(data, path)
+    elif resource.startswith('tags/'):
+        for directory, kind in TAG_KINDS.items():
+            if resource.startswith('tags/%s/' % directory):
+                for entry in data.get('values', ()):
+                    entry = entry['id'] if isinstance(entry, dict) else entry
+                    yield Reference(kind + '_tag', resource_id(entry[1:]), path) if entry.startswith('#') else Reference(kind, resource_id(entry), path)
+    elif resource.startswith('loot_tables/blocks/'):
+        yield Reference('block', '%s:%s' % (namespace, resource[len('loot_tables/blocks/'):]), path)
+        yield from json_references(data, path)
+    else:
+        yield from json_references(data, path, resource.startswith('tfc/drinkables/'))
+
+
+def dangling_references(rm: ResourceManager) -> List[Reference]:
+    """
+    Indexes every id defined by the Java registries and the generated resources, then resolves every reference made by the generated resources in a single pass.
+    Only references into this mod's namespace can be checked. Returns all references which do not resolve.
+    """
+    resources = load_resources(rm)
+    defined = java_definitions(rm) | resource_definitions(rm, resources)
+    prefix = rm.domain + ':'
+    return [
+        reference
+        for path, data in sorted(resources.items())
+        for reference in resource_references(path, data)
+        if reference.id.startswith(prefix) and (reference.kind, reference.id) not in defined
+    ]
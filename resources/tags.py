@@ -0,0 +1,81 @@
+import os
+from typing import Any, Collection, Dict, Iterator, List, Sequence, Set
+
+from mcresources import ResourceManager
+from mcresources.type_definitions import Json
+
+from references import resource_references
+from validation import load_resources
+
+
+def tag_entry_id(entry: Json) -> str:
+    return entry['id'] if isinstance(entry, dict) else entry
+
+
+def tag_entry_required(entry: Json) -> bool:
+    return not isinstance(entry, dict) or entry.get('required', True)
+
+
+def expand_tag(tags: Dict[str, List[Json]], name: str, required: bool = True, visiting: Sequence[str] = ()) -> Dict[str, bool]:
+    """ Expands a tag into its leaf entries, mapped to whether they are required. References to tags not in `tags` are leaves. """
+    assert name not in visiting, 'Cycle in tag references: %s' % ' -> '.join((*visiting, name))
+    leaves: Dict[str, bool] = {}
+    for entry in tags[name]:
+        ref = tag_entry_id(entry)
+        is_required = required and tag_entry_required(entry)
+        if ref.startswith('#') and ref[1:] in tags:
+            expanded = expand_tag(tags, ref[1:], is_required, (*visiting, name))
+        else:
+            expanded = {ref: is_required}
+        for leaf, leaf_required in expanded.items():
+            leaves[leaf] = leaves.get(leaf, False) or leaf_required
+    return leaves
+
+
+def hash_references(data: Any) -> Iterator[str]:
+    """ Every '#namespace:path' string in a json value """
+    if isinstance(data, list):
+        for value in data:
+            yield from hash_references(value)
+    elif isinstance(data, dict):
+        for value in data.values():
+            yield from hash_references(value)
+    elif isinstance(data, str) and data.startswith('#') and ':' in data:
+        yield data[1:]
+
+
+def referenced_tags(rm: ResourceManager) -> Set[str]:
+    """ Every tag referenced by a data resource which is not itself a tag, such as recipes and drinkables. Read from disk, so resources which are not generated are included. """
+    referenced = set()
+    for path, data in load_resources(rm).items():
+        pack_type, _, resource = path.split('/', 2)
+        if pack_type == 'data' and not resource.startswith('tags/'):
+            referenced.update(reference.id for reference in resource_references(path, data) if reference.kind.endswith('_tag'))
+            referenced.update(hash_references(data))
+    return referenced
+
+
+def flatten_tags(rm: ResourceManager, tag_type: str, keep: Collection[str]) -> List[str]:
+    """
+    Rewrites every buffered tag of `tag_type` as a flat list of leaf entries, and drops tags of this domain which are only used as intermediate references.
+    Tags in other domains, and those listed in `keep`, are retained. Returns the names of dropped tags, and removes their previously generated files.
+    """
+    buffer = rm.tags_buffer[tag_type]
+    nested = {res.join(): tag.values for res, tag in buffer.items()}
+    kept = [res for res in buffer if res.domain != rm.domain or res.join() in keep]
+    flattened = {
+        res.join(): [leaf if required else {'id': leaf, 'required': False} for leaf, required in expand_tag(nested, res.join()).items()]
+        for res in kept
+    }
+    for name in flattened:
+        assert expand_tag(nested, name) == expand_tag(flattened, name), 'Flattened tag %s does not match its nested expansion' % name
+
+    dropped = [res for res in buffer if res not in kept]
+    for res in dropped:
+        del buffer[res]
+        path = os.path.join(*rm.resource_dir, 'data', res.domain, 'tags', tag_type, res.path + '.json')
+        if os.path.isfile(path):
+            os.remove(path)
+    for res in kept:
+        buffer[res].values = flattened[res.join()]
+    return [res.join() for res in dropped]
@@ -0,0 +1,123 @@
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+from PIL import Image
+from mcresources import ResourceManager
+
+from dead_assets import texture_files
+
+
+class TextureResult(NamedTuple):
+    name: str
+    old_size: int
+    new_size: int  # Equal to old_size if the file was left unchanged
+
+
+def load_rgba(data: bytes) -> np.ndarray:
+    with Image.open(io.BytesIO(data)) as image:
+        return np.asarray(image.convert('RGBA'))
+
+
+def encode(image: Image.Image, **params) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, 'png', optimize=True, **params)
+    return buffer.getvalue()
+
+
+def encode_candidates(pixels: np.ndarray) -> List[bytes]:
+    """ Lossless encodings of an RGBA image: truecolor, and an exact palette when there are at most 256 distinct colors. Metadata (icc profiles, exif, dpi) is not kept. """
+    height, width, _ = pixels.shape
+    opaque = bool((pixels[..., 3] == 255).all())
+    candidates = [encode(Image.fromarray(pixels[..., :3] if opaque else pixels, 'RGB' if opaque else 'RGBA'))]
+
+    colors, indices = np.unique(pixels.reshape(-1, 4), axis=0, return_inverse=True)
+    if len(colors) <= 256:
+        image = Image.fromarray(indices.reshape(height, width).astype(np.uint8), 'P')
+        image.putpalette(colors[:, :3].flatten().tolist())
+        candidates.append(encode(image) if opaque else encode(image, transparency=colors[:, 3].tobytes()))
+    return candidates
+
+
+def optimize_texture(name: str, path: str) -> TextureResult:
+    """ Rewrites a png with its smallest exact encoding. Encoding is deterministic, so optimizing an already optimized file leaves it untouched. """
+    with open(path, 'rb') as f:
+        original = f.read()
+    pixels = load_rgba(original)
+    best = min(encode_candidates(pixels), key=len)
+    if len(best) >= len(original) or not np.array_equal(load_rgba(best), pixels):
+        return TextureResult(name, len(original), len(original))
+    with open(path, 'wb') as f:
+        f.write(best)
+    return TextureResult(name, len(original), len(best))
+
+
+def optimize_textures(rm: ResourceManager) -> List[TextureResult]:
+    textures = texture_files(os.path.join(*rm.resource_dir, 'assets', rm.domain))
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        return list(pool.map(lambda item: optimize_texture(*item), sorted(textures.items())))
+
+
+class TextureFingerprint(NamedTuple):
+    name: str
+    pixels: np.ndarray
+    digest: bytes  # Of the shape and pixels, so only pixel identical textures share a digest
+    perceptual: int  # 64 bit average hash, see average_hash()
+
+
+def average_hash(pixels: np.ndarray) -> int:
+    """ One bit per cell of an 8x8 grid, set if the cell is brighter than the mean. Textures which differ in a few pixels have equal or nearly equal hashes. """
+    luminance = (pixels[..., :3].astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)) * (pixels[..., 3] / 255)
+    cells = np.asarray(Image.fromarray(luminance.astype(np.float32), 'F').resize((8, 8), Image.BOX))
+    return int(np.packbits(cells.ravel() > cells.mean()).view('>u8')[0])
+
+
+def fingerprint(name: str, path: str) -> TextureFingerprint:
+    with open(path, 'rb') as f:
+        pixels = load_rgba(f.read())
+    return TextureFingerprint(name, pixels, hashlib.sha1(repr(pixels.shape).encode('utf-8') + pixels.tobytes()).digest(), average_hash(pixels))
+
+
+def similar_textures(rm: ResourceManager, tolerance: float = 0.02, max_hash_distance: int = 3) -> List[Tuple[str, str, int]]:
+    """
+    Finds textures which are pixel identical, or of the same size and differ in at most `tolerance` of their pixels.
+    Identical textures are grouped by digest. Near identical candidates are textures whose average hashes differ in at most `max_hash_distance` bits: the hash is split into `max_hash_distance + 1` bands, and any two such hashes share at least one band, so only textures sharing a band bucket are compared pixel by pixel.
+    Returns (first, second, number of differing pixels) for each pair.
+    """
+    textures = texture_files(os.path.join(*rm.resource_dir, 'assets', rm.domain))
+    with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as pool:
+        fingerprints = list(pool.map(lambda item: fingerprint(*item), sorted(textures.items())))
+
+        pairs = []
+        identical: Dict[bytes, List[TextureFingerprint]] = {}
+        for texture in fingerprints:
+            identical.setdefault(texture.digest, []).append(texture)
+        for group in identical.values():
+            pairs += [(group[0].name, other.name, 0) for other in group[1:]]
+
+        # One texture per identical group, only those need comparing
+        unique = [group[0] for group in identical.values()]
+        bands = max_hash_distance + 1
+        band_bits = -(-64 // bands)
+        buckets: Dict[Tuple[Tuple[int, ...], int, int], List[int]] = {}
+        for index, texture in enumerate(unique):
+            for band in range(bands):
+                buckets.setdefault((texture.pixels.shape, band, (texture.perceptual >> (band * band_bits)) & ((1 << band_bits) - 1)), []).append(index)
+        candidates = sorted({
+            (i, j)
+            for bucket in buckets.values()
+            for n, i in enumerate(bucket)
+            for j in bucket[n + 1:]
+            if bin(unique[i].perceptual ^ unique[j].perceptual).count('1') <= max_hash_distance
+        })
+
+        def differences(pair: Tuple[int, int]) -> int:
+            return int((unique[pair[0]].pixels != unique[pair[1]].pixels).any(axis=-1).sum())
+
+        for (i, j), count in zip(candidates, pool.map(differences, candidates)):
+            if count <= tolerance * unique[i].pixels.shape[0] * unique[i].pixels.shape[1]:
+                pairs.append((unique[i].name, unique[j].name, count))
+    return pairs
@@ -0,0 +1,253 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from mcresources import ResourceManager
+
+# A compiled schema: yields an error message for each problem found in a value at a json path
+Validator = Callable[[Any, str], Iterator[str]]
+
+
+class Obj(NamedTuple):
+    required: Dict[str, Any]
+    optional: Dict[str, Any] = {}
+    strict: bool = False  # If unknown keys are an error
+
+
+class ListOf(NamedTuple):
+    item: Any
+    min_length: int = 0
+
+
+class DictOf(NamedTuple):
+    key: Any
+    value: Any
+
+
+class OneOf(NamedTuple):
+    options: Tuple[Any, ...]
+
+
+class Num(NamedTuple):
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    integer: bool = False
+
+
+class Dispatch(NamedTuple):
+    key: str  # The value of this key selects the schema, i.e. 'type'
+    schemas: Dict[str, Any]
+    default: Any
+
+
+def compile_schema(schema: Any) -> Validator:
+    """ Compiles a schema into a validator once, so validating a resource is only a walk over the value. """
+    if schema is None:
+        return lambda value, path: iter(())
+    if isinstance(schema, type):
+        def validate_type(value: Any, path: str) -> Iterator[str]:
+            if not isinstance(value, schema) or (schema is int and isinstance(value, bool)):
+                yield '%s: expected %s, got %s' % (path, schema.__name__, json.dumps(value))
+        return validate_type
+    if isinstance(schema, re.Pattern):
+        def validate_pattern(value: Any, path: str) -> Iterator[str]:
+            if not isinstance(value, str) or not schema.fullmatch(value):
+                yield '%s: expected a value matching %s, got %s' % (path, schema.pattern, json.dumps(value))
+        return validate_pattern
+    if isinstance(schema, Num):
+        def validate_number(value: Any, path: str) -> Iterator[str]:
+            if isinstance(value, bool) or not isinstance(value, int if schema.integer else (int, float)):
+                yield '%s: expected %s, got %s' % (path, 'an integer' if schema.integer else 'a number', json.dumps(value))
+            elif (schema.minimum is not None and value < schema.minimum) or (schema.maximum is not None and value > schema.maximum):
+                yield '%s: %s is outside [%s, %s]' % (path, value, schema.minimum, schema.maximum)
+        return validate_number
+    if isinstance(schema, ListOf):
+        item = compile_schema(schema.item)
+
+        def validate_list(value: Any, path: str) -> Iterator[str]:
+            if not isinstance(value, list):
+                yield '%s: expected a list, got %s' % (path, json.dumps(value))
+            elif len(value) < schema.min_length:
+                yield '%s: expected at least %d entries' % (path, schema.min_length)
+            else:
+                for i, entry in enumerate(value):
+                    yield from item(entry, '%s[%d]' % (path, i))
+        return validate_list
+    if isinstance(schema, DictOf):
+        key, entry = compile_schema(schema.key), compile_schema(schema.value)
+
+        def validate_dict(value: Any, path: str) -> Iterator[str]:
+            if not isinstance(value, dict):
+                yield '%s: expected an object, got %s' % (path, json.dumps(value))
+            else:
+                for k, v in value.items():
+                    yield from key(k, '%s<key %s>' % (path, k))
+                    yield from entry(v, '%s.%s' % (path, k))
+        return validate_dict
+    if isinstance(schema, Obj):
+        required = {k: compile_schema(v) for k, v in schema.required.items()}
+        fields = {**required, **{k: compile_schema(v) for k, v in schema.optional.items()}}
+
+        def validate_object(value: Any, path: str) -> Iterator[str]:
+            if not isinstance(value, dict):
+                yield '%s: expected an object, got %s' % (path, json.dumps(value))
+                return
+            for k in required:
+                if k not in value:
+                    yield '%s: missing required field \'%s\'' % (path, k)
+            for k, v in value.items():
+                if k in fields:
+                    yield from fields[k](v, '%s.%s' % (path, k))
+                elif schema.strict and k != '__comment__':
+                    yield '%s: unknown field \'%s\'' % (path, k)
+        return validate_object
+    if isinstance(schema, OneOf):
+        options = [compile_schema(option) for option in schema.options]
+
+        def validate_one_of(value: Any, path: str) -> Iterator[str]:
+            errors = []
+            for option in options:
+                option_errors = list(option(value, path))
+                if not option_errors:
+                    return
+                errors.append(option_errors)
+            closest = min(errors, key=len)
+            yield '%s: matched none of %d options, closest: %s' % (path, len(options), '; '.join(closest))
+        return validate_one_of
+    if isinstance(schema, Dispatch):
+        schemas = {k: compile_schema(v) for k, v in schema.schemas.items()}
+        default = compile_schema(schema.default)
+
+        def validate_dispatch(value: Any, path: str) -> Iterator[str]:
+            selected = schemas.get(value.get(schema.key)) if isinstance(value, dict) else None
+            yield from (selected or default)(value, path)
+        return validate_dispatch
+    raise TypeError('Not a schema: %s' % repr(schema))
+
+
+ID = re.compile(r'([a-z0-9_.-]+:)?[a-z0-9_./-]+')
+TAG_OR_ID = re.compile(r'#?([a-z0-9_.-]+:)?[a-z0-9_./-]+')
+
+CONDITIONS = ListOf(Obj({'type': ID}))
+ITEM_INGREDIENT = OneOf((
+    Obj({'item': ID}, {'count': Num(1, integer=True)}, strict=True),
+    Obj({'tag': ID}, {'count': Num(1, integer=True)}, strict=True),
+    Obj({'type': ID}),  # Custom ingredient types, i.e. tfc:not_rotten
+    ListOf(OneOf((Obj({'item': ID}, strict=True), Obj({'tag': ID}, strict=True))), 1)
+))
+ITEM_STACK = Obj({'item': ID}, {'count': Num(1, integer=True), 'nbt': OneOf((str, dict))}, strict=True)
+ITEM_STACK_PROVIDER = OneOf((ITEM_STACK, Obj({}, {'stack': ITEM_STACK, 'modifiers': ListOf(OneOf((ID, Obj({'type': ID}))))}, strict=True)))
+FLUID_INGREDIENT = OneOf((ID, Obj({'fluid': ID}, strict=True), Obj({'tag': ID}, strict=True), ListOf(OneOf((ID, Obj({'fluid': ID}, strict=True), Obj({'tag': ID}, strict=True))), 1)))
+FLUID_STACK_INGREDIENT = Obj({'ingredient': FLUID_INGREDIENT, 'amount': Num(1, integer=True)}, strict=True)
+FLUID_STACK = Obj({'fluid': ID, 'amount': Num(1, integer=True)}, {'nbt': dict}, strict=True)
+ITEM_STACK_INGREDIENT = Obj({'ingredient': ITEM_INGREDIENT}, {'count': Num(1, integer=True)}, strict=True)
+
+
+def recipe(required: Dict[str, Any], optional: Dict[str, Any] = None) -> Obj:
+    return Obj({'type': ID, **required}, {'group': str, 'conditions': CONDITIONS, **(optional or {})}, strict=True)
+
+
+BARREL_OPTIONAL = {'input_item': ITEM_STACK_INGREDIENT, 'input_fluid': FLUID_STACK_INGREDIENT, 'output_item': ITEM_STACK_PROVIDER, 'output_fluid': FLUID_STACK, 'sound': ID}
+
+RECIPE = Dispatch('type', {
+    'minecraft:crafting_shaped': recipe({'pattern': ListOf(str, 1), 'key': DictOf(str, ITEM_INGREDIENT), 'result': ITEM_STACK}, {'category': str, 'show_notification': bool}),
+    'minecraft:crafting_shapeless': recipe({'ingredients': ListOf(ITEM_INGREDIENT, 1), 'result': ITEM_STACK}, {'category': str}),
+    'tfc:advanced_shaped_crafting': recipe({'pattern': ListOf(str, 1), 'key': DictOf(str, ITEM_INGREDIENT), 'result': ITEM_STACK_PROVIDER, 'input_row': Num(0, integer=True), 'input_column': Num(0, integer=True)}),
+    'tfc:advanced_shapeless_crafting': recipe({'ingredients': ListOf(ITEM_INGREDIENT, 1), 'result': ITEM_STACK_PROVIDER}, {'primary_ingredient': ITEM_INGREDIENT}),
+    'tfc:heating': recipe({'ingredient': ITEM_INGREDIENT, 'temperature': Num(0)}, {'result_item': ITEM_STACK_PROVIDER, 'result_fluid': FLUID_STACK, 'use_durability': bool}),
+    'tfc:quern': recipe({'ingredient': ITEM_INGREDIENT, 'result': ITEM_STACK_PROVIDER}),
+    'tfc:barrel_instant': recipe({}, BARREL_OPTIONAL),
+    'tfc:barrel_sealed': recipe({'duration': Num(-1, integer=True)}, {**BARREL_OPTIONAL, 'on_seal': dict, 'on_unseal': dict}),
+    'poisoned_drinks:poisoning': recipe({'poison': ITEM_INGREDIENT, 'fluids': DictOf(ID, ID), 'amount_per_poison': Num(1, integer=True), 'max_poisons': Num(1, integer=True)}, {'min_amount': Num(0, integer=True)}),
+    'poisoned_drinks:barrel_poisoning': recipe({'input_item': ITEM_STACK_INGREDIENT, 'input_fluid': FLUID_STACK_INGREDIENT, 'fluids': DictOf(ID, ID)}, {'sound': ID}),
+}, Obj({}, {'type': ID, 'conditions': CONDITIONS}))  # Unknown recipe types, and disabled recipes which only have conditions
+
+LOOT_CONDITIONS = ListOf(Obj({'condition': ID}))
+LOOT_FUNCTIONS = ListOf(Obj({'function': ID}, {'conditions': LOOT_CONDITIONS}))
+LOOT_TABLE = Obj({}, {'type': ID, 'pools': ListOf(Obj({'rolls': OneOf((Num(0), dict)), 'entries': ListOf(Obj({'type': ID}, {'conditions': LOOT_CONDITIONS, 'functions': LOOT_FUNCTIONS}))}, {'conditions': LOOT_CONDITIONS, 'functions': LOOT_FUNCTIONS})), 'functions': LOOT_FUNCTIONS}, strict=True)
+TAG = Obj({'values': ListOf(OneOf((TAG_OR_ID, Obj({'id': TAG_OR_ID}, {'required': bool}, strict=True))))}, {'replace': bool}, strict=True)
+CONFIGURED_FEATURE = Obj({'type': ID, 'config': dict}, strict=True)
+PLACED_FEATURE = Obj({'feature': OneOf((ID, CONFIGURED_FEATURE)), 'placement': ListOf(Obj({'type': ID}))}, strict=True)
+MODEL = Obj({}, {'parent': ID, 'textures': DictOf(str, str), 'loader': ID, 'elements': list, 'display': dict, 'ambientocclusion': bool, 'gui_light': str, 'overrides': list, 'render_type': ID})  # Not strict, as model loaders add their own fields
+VARIANT = Obj({'model': ID}, {'x': Num(integer=True), 'y': Num(integer=True), 'uvlock': bool, 'weight': Num(1, integer=True)}, strict=True)
+BLOCKSTATE = OneOf((
+    Obj({'variants': DictOf(str, OneOf((VARIANT, ListOf(VARIANT, 1))))}, strict=True),
+    Obj({'multipart': ListOf(Obj({'apply': OneOf((VARIANT, ListOf(VARIANT, 1)))}, {'when': dict}, strict=True))}, strict=True)
+))
+LANG = DictOf(str, str)
+DRINKABLE = Obj({'ingredient': FLUID_INGREDIENT}, {'thirst': Num(0), 'intoxication': Num(0), 'effects': ListOf(Obj({'type': ID}, {'duration': Num(1, integer=True), 'amplifier': Num(0, integer=True), 'chance': Num(0, 1)}, strict=True)), 'may_drink_when_full': bool, 'consume_chance': Num(0, 1), 'food': dict}, strict=True)
+CLIMATE_RANGE = Obj({}, {k: Num() for k in ('min_hydration', 'max_hydration', 'hydration_wiggle_range', 'min_temperature', 'max_temperature', 'temperature_wiggle_range')}, strict=True)
+FOOD_ITEM = Obj({'ingredient': ITEM_INGREDIENT}, {'hunger': Num(0, integer=True), 'saturation': Num(0), 'water': Num(0), 'decay_modifier': Num(0), **{k: Num(0) for k in ('grain', 'fruit', 'vegetables', 'protein', 'dairy')}}, strict=True)
+ITEM_HEAT = Obj({'ingredient': ITEM_INGREDIENT, 'heat_capacity': Num(0)}, {'forging_temperature': Num(0), 'welding_temperature': Num(0)}, strict=True)
+
+# (pack type, path prefix below the namespace) -> schema. The longest matching prefix applies, and resources without a match are not validated
+SCHEMAS: Dict[Tuple[str, str], Any] = {
+    ('data', 'recipes/'): RECIPE,
+    ('data', 'loot_tables/'): LOOT_TABLE,
+    ('data', 'tags/'): TAG,
+    ('data', 'worldgen/configured_feature/'): CONFIGURED_FEATURE,
+    ('data', 'worldgen/placed_feature/'): PLACED_FEATURE,
+    ('data', 'tfc/drinkables/'): DRINKABLE,
+    ('data', 'tfc/climate_ranges/'): CLIMATE_RANGE,
+    ('data', 'tfc/food_items/'): FOOD_ITEM,
+    ('data', 'tfc/item_heats/'): ITEM_HEAT,
+    ('assets', 'models/'): MODEL,
+    ('assets', 'blockstates/'): BLOCKSTATE,
+    ('assets', 'lang/'): LANG,
+}
+VALIDATORS: Dict[Tuple[str, str], Validator] = {key: compile_schema(schema) for key, schema in SCHEMAS.items()}
+PREFIXES: List[Tuple[str, str]] = sorted(VALIDATORS, key=lambda key: -len(key[1]))
+
+PARALLEL_THRESHOLD = 256  # Below this many resources, starting worker processes costs more than it saves
+
+
+def validator_for(path: str) -> Optional[Validator]:
+    """ :param path: A resource path relative to the resource root, i.e. data/tfc/tags/fluids/drinkables.json """
+    pack_type, _, resource = path.split('/', 2)
+    for key in PREFIXES:
+        if key[0] == pack_type and resource.startswith(key[1]):
+            return VALIDATORS[key]
+    return None
+
+
+def validate_chunk(resources: Sequence[Tuple[str, Any]]) -> List[str]:
+    errors = []
+    for path, data in resources:
+        validator = validator_for(path)
+        if validator is not None:
+            errors.extend('%s: %s' % (path, error) for error in validator(data, '$'))
+    return errors
+
+
+def validate_resources(resources: Dict[str, Any], workers: Optional[int] = None) -> List[str]:
+    """
+    Validates resources held in memory, keyed by their path relative to the resource root. Returns all errors, in path order.
+    Large outputs are split across a process pool.
+    """
+    items = sorted(resources.items())
+    if len(items) < PARALLEL_THRESHOLD:
+        return validate_chunk(items)
+    workers = workers or os.cpu_count() or 1
+    chunks = [items[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return sorted(error for errors in pool.map(validate_chunk, chunks) for error in errors)
+
+
+def load_resources(rm: ResourceManager) -> Dict[str, Any]:
+    """ Every json resource on disk below the resource root, keyed by path relative to it """
+    resources = {}
+    root = os.path.join(*rm.resource_dir)
+    for pack_type in ('data', 'assets'):
+        for directory, _, files in os.walk(os.path.join(root, pack_type)):
+            for file in files:
+                if file.endswith('.json'):
+                    path = os.path.join(directory, file)
+                    with open(path, 'r', encoding='utf-8') as f:
+                        resources[os.path.relpath(path, root).replace(os.sep, '/')] = json.load(f)
+    return resources
+
+
+def validate_output(rm: ResourceManager, workers: Optional[int] = None) -> List[str]:
+    return validate_resources(load_resources(rm), workers)
@@ -0,0 +1,159 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from mcresources import ResourceManager
+
+from climate_index import RAINFALL_RANGE, TEMPERATURE_RANGE
+from model_dedup import resource_id
+from validation import load_resources
+
+# Placement modifier type -> (cost per position, fraction of positions which pass), in units of roughly one block state lookup
+# Block predicate filters are keyed by their predicate type. Pass rates for terrain dependent checks are estimates.
+MODIFIER_COSTS: Dict[str, Tuple[float, float]] = {
+    'minecraft:in_square': (0.1, 1),
+    'minecraft:count': (0.1, 1),
+    'minecraft:random_offset': (0.1, 1),
+    'minecraft:heightmap': (1, 1),
+    'minecraft:height_range': (0.1, 1),
+    'minecraft:environment_scan': (8, 0.5),
+    'tfc:biome': (0.5, 0.9),
+    'tfc:climate': (0.5, 1),  # Pass rate is computed from the climate bounds
+    'tfc:shallow_water': (5, 0.2),
+    'tfc:flat_enough': (10, 0.5),
+    'tfc:underground': (1, 0.5),
+    'tfc:near_fluid': (20, 0.2),
+    'tfc:on_top': (1, 0.3),
+    'tfc:no_solid_neighbors': (4, 0.5),
+    'tfc:carving_mask': (2, 0.1),
+    'minecraft:matching_blocks': (1, 0.3),
+    'minecraft:replaceable': (1, 0.5),
+    'minecraft:would_survive': (3, 0.5),
+    'tfc:replaceable': (1, 0.5),
+    'tfc:dry_replaceable': (1, 0.5),
+    'tfc:air_or_empty_fluid': (1, 0.5),
+    'tfc:would_survive_with_fluid': (3, 0.3),
+}
+DEFAULT_MODIFIER_COST = (1, 1)
+
+# Configured feature type -> cost of placing the feature once. Patch features are costed by their tries instead
+FEATURE_COSTS: Dict[str, float] = {
+    'minecraft:simple_block': 2,
+    'tfc:block_with_fluid': 3,
+    'tfc:emergent_plant': 4,
+    'tfc:tall_plant': 4,
+    'tfc:epiphyte_plant': 6,
+    'tfc:submerged_tall_plant': 4,
+}
+DEFAULT_FEATURE_COST = 5
+DEFAULT_COUNT = 4  # Used for int providers other than constant and uniform
+PATCH_FEATURES = ('minecraft:random_patch', 'tfc:dynamic_random_patch')
+SELECTOR_FEATURES = ('minecraft:random_selector', 'minecraft:simple_random_selector')
+
+
+class FeatureCost(NamedTuple):
+    feature: str
+    expected: float  # Expected cost per chunk, over climates sampled uniformly across the climate space
+    worst: float  # Cost per chunk in a climate which passes every climate gate
+    placements: float  # Expected singular features placed per chunk, in a climate which passes every climate gate
+
+
+def climate_pass_rate(modifier: Dict[str, Any]) -> float:
+    """ The fraction of the climate space inside a tfc:climate gate's temperature and rainfall bounds. Forest bounds are not considered. """
+    rate = 1.0
+    for (low, high), min_key, max_key in ((TEMPERATURE_RANGE, 'min_temperature', 'max_temperature'), (RAINFALL_RANGE, 'min_rainfall', 'max_rainfall')):
+        lower = max(low, modifier[min_key]) if modifier.get(min_key) is not None else low
+        upper = min(high, modifier[max_key]) if modifier.get(max_key) is not None else high
+        rate *= max(0.0, upper - lower) / (high - low)
+    return rate
+
+
+def count_of(value: Any) -> float:
+    """ The mean of a constant or uniform int provider """
+    if isinstance(value, dict):
+        return (value['value']['min_inclusive'] + value['value']['max_inclusive']) / 2 if resource_id(value['type']) == 'minecraft:uniform' else DEFAULT_COUNT
+    return value
+
+
+def modifier_cost(modifier: Any, climate: bool) -> Tuple[float, float, float]:
+    """ (cost per position, pass rate, positions produced per position passed). With `climate` false, climate gates always pass. """
+    if isinstance(modifier, str):
+        modifier = {'type': modifier}
+    modifier_type = resource_id(modifier['type'])
+    if modifier_type == 'minecraft:block_predicate_filter':
+        modifier_type = resource_id(modifier['predicate']['type'])
+    cost, rate = MODIFIER_COSTS.get(modifier_type, DEFAULT_MODIFIER_COST)
+    if modifier_type == 'minecraft:rarity_filter':
+        cost, rate = 0.1, 1 / modifier['chance']
+    elif modifier_type == 'tfc:climate' and climate:
+        rate = climate_pass_rate(modifier)
+    return cost, rate, count_of(modifier['count']) if modifier_type == 'minecraft:count' else 1
+
+
+def feature_data(resources: Dict[str, Any], feature_type: str, name: str) -> Optional[Dict[str, Any]]:
+    domain, path = resource_id(name).split(':', 1)
+    return resources.get('data/%s/worldgen/%s/%s.json' % (domain, feature_type, path))
+
+
+def selected_features(feature_type: str, config: Dict[str, Any]) -> List[Tuple[float, Any]]:
+    """ (probability, placed feature) for each feature a selector can pick """
+    if feature_type == 'minecraft:simple_random_selector':
+        return [(1 / len(config['features']), placed) for placed in config['features']]
+    selected, remaining = [], 1.0
+    for entry in config['features']:
+        selected.append((remaining * entry['chance'], entry['feature']))
+        remaining *= 1 - entry['chance']
+    return selected + [(remaining, config['default'])]
+
+
+def configured_cost(resources: Dict[str, Any], configured: Any, climate: bool, visiting: Tuple[str, ...]) -> Tuple[float, float]:
+    """ (cost, singular features placed) of placing a configured feature, given by id or inline, at one position """
+    if isinstance(configured, str):
+        key = 'configured_feature/' + configured
+        assert key not in visiting, 'Cycle in features: %s' % ' -> '.join(visiting + (key,))
+        visiting, configured = visiting + (key,), feature_data(resources, 'configured_feature', configured)
+        if configured is None:
+            return DEFAULT_FEATURE_COST, 1  # A feature from another mod, or vanilla
+    feature_type = resource_id(configured['type'])
+    if feature_type in PATCH_FEATURES:
+        cost, placements = placed_cost(resources, configured['config']['feature'], climate, visiting)
+        tries = configured['config'].get('tries', 128)
+        return tries * cost, tries * placements
+    if feature_type in SELECTOR_FEATURES:
+        cost, placements = 0.0, 0.0
+        for chance, placed in selected_features(feature_type, configured['config']):
+            feature_cost, feature_placements = placed_cost(resources, placed, climate, visiting)
+            cost, placements = cost + chance * feature_cost, placements + chance * feature_placements
+        return cost, placements
+    return FEATURE_COSTS.get(feature_type, DEFAULT_FEATURE_COST), 1
+
+
+def placed_cost(resources: Dict[str, Any], placed: Any, climate: bool, visiting: Tuple[str, ...] = ()) -> Tuple[float, float]:
+    """ (cost, singular features placed) of a placed feature, given by id or inline, run at one position. Each modifier is paid for by every position reaching it. """
+    if isinstance(placed, str):
+        key = 'placed_feature/' + placed
+        assert key not in visiting, 'Cycle in features: %s' % ' -> '.join(visiting + (key,))
+        visiting, placed = visiting + (key,), feature_data(resources, 'placed_feature', placed)
+        if placed is None:
+            return DEFAULT_FEATURE_COST, 1
+    cost, positions = 0.0, 1.0
+    for modifier in placed.get('placement', ()):
+        modifier_cost_per_position, rate, count = modifier_cost(modifier, climate)
+        cost += positions * modifier_cost_per_position
+        positions *= rate * count
+    feature_cost, placements = configured_cost(resources, placed['feature'], climate, visiting)
+    return cost + positions * feature_cost, positions * placements
+
+
+def worldgen_costs(rm: ResourceManager) -> List[FeatureCost]:
+    """ The per chunk cost of every generated placed feature which is added to generation through a placed feature tag """
+    resources = load_resources(rm)
+    features = set()
+    for path, data in resources.items():
+        if path.startswith('data/') and '/tags/worldgen/placed_feature/' in path:
+            features.update(resource_id(entry['id'] if isinstance(entry, dict) else entry) for entry in data['values'] if not (entry['id'] if isinstance(entry, dict) else entry).startswith('#'))
+    costs = []
+    for feature in sorted(features):
+        if feature_data(resources, 'placed_feature', feature) is not None:
+            expected, _ = placed_cost(resources, feature, True)
+            worst, placements = placed_cost(resources, feature, False)
+            costs.append(FeatureCost(feature, expected, worst, placements))
+    return costs
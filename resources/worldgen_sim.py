@@ -0,0 +1,112 @@
+import json
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from mcresources import ResourceManager
+
+from climate_index import RAINFALL_RANGE, TEMPERATURE_RANGE
+
+
+class PatchParameters(NamedTuple):
+    rarity: int  # minecraft:rarity_filter chance, one in this many chunks
+    tries: int
+    xz_spread: int
+    y_spread: int
+    min_temp: float
+    max_temp: float
+    min_rain: float
+    max_rain: float
+
+
+class Estimate(NamedTuple):
+    mean: float
+    low: float  # 95% confidence interval
+    high: float
+
+
+class BandEstimate(NamedTuple):
+    temp: Tuple[float, float]
+    rain: Tuple[float, float]
+    per_chunk: Estimate
+
+
+class DensityReport(NamedTuple):
+    chunks: int
+    patches_per_chunk: Estimate  # In a climate which passes the climate gate
+    crops_per_patch: Estimate
+    crops_per_chunk: Estimate  # In a climate which passes the climate gate
+    bands: List[BandEstimate]  # Crops per chunk in each climate band, sampling climates uniformly within the band
+
+
+def read_feature(rm: ResourceManager, feature_type: str, name: str) -> Dict[str, Any]:
+    domain, path = name.split(':', 1)
+    with open(os.path.join(*rm.resource_dir, 'data', domain, 'worldgen', feature_type, path + '.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def read_placed_feature_tag(rm: ResourceManager, name: str) -> List[str]:
+    domain, path = name.split(':', 1)
+    with open(os.path.join(*rm.resource_dir, 'data', domain, 'tags', 'worldgen', 'placed_feature', path + '.json'), 'r', encoding='utf-8') as f:
+        return [entry['id'] if isinstance(entry, dict) else entry for entry in json.load(f)['values']]
+
+
+def patch_parameters(rm: ResourceManager, placed_patch: str) -> PatchParameters:
+    """ Reads the parameters of a generated rarity filtered, climate gated random_patch placed feature """
+    placed = read_feature(rm, 'placed_feature', placed_patch)
+    config = read_feature(rm, 'configured_feature', placed['feature'])['config']
+    modifiers = {modifier['type']: modifier for modifier in placed['placement'] if isinstance(modifier, dict)}
+    climate = modifiers.get('tfc:climate', {})
+    return PatchParameters(
+        modifiers['minecraft:rarity_filter']['chance'] if 'minecraft:rarity_filter' in modifiers else 1,
+        config['tries'], config['xz_spread'], config['y_spread'],
+        climate.get('min_temperature', -float('inf')), climate.get('max_temperature', float('inf')),
+        climate.get('min_rainfall', -float('inf')), climate.get('max_rainfall', float('inf'))
+    )
+
+
+def estimate(samples: np.ndarray) -> Estimate:
+    mean = float(samples.mean()) if samples.size else 0.0
+    error = 1.96 * float(samples.std(ddof=1)) / np.sqrt(samples.size) if samples.size > 1 else 0.0
+    return Estimate(mean, mean - error, mean + error)
+
+
+def simulate_patches(params: PatchParameters, count: int, survival: float, rng: np.random.Generator) -> np.ndarray:
+    """
+    Crops placed by each of `count` patches. Each try offsets from the patch origin like vanilla random_patch (nextInt(spread + 1) - nextInt(spread + 1)), and succeeds with probability `survival` (replaceable and would_survive).
+    The singular feature snaps to the surface heightmap, so tries landing on an already placed column do not place again.
+    """
+    spread = params.xz_spread + 1
+    dx = rng.integers(0, spread, (count, params.tries)) - rng.integers(0, spread, (count, params.tries))
+    dz = rng.integers(0, spread, (count, params.tries)) - rng.integers(0, spread, (count, params.tries))
+    columns = np.where(rng.random((count, params.tries)) < survival, (dx + params.xz_spread) * (2 * params.xz_spread + 1) + dz + params.xz_spread, -1)
+    columns.sort(axis=1)
+    distinct = (columns >= 0) & np.concatenate([np.ones((count, 1), dtype=bool), columns[:, 1:] != columns[:, :-1]], axis=1)
+    return distinct.sum(axis=1)
+
+
+def simulate_chunks(params: PatchParameters, temp: np.ndarray, rain: np.ndarray, survival: float, rng: np.random.Generator) -> np.ndarray:
+    """ Crops placed in each chunk, given the climate at each chunk's patch origin """
+    placed = np.zeros(temp.size, dtype=np.int64)
+    patch = (rng.random(temp.size) < 1 / params.rarity) & (params.min_temp <= temp) & (temp <= params.max_temp) & (params.min_rain <= rain) & (rain <= params.max_rain)
+    placed[patch] = simulate_patches(params, int(patch.sum()), survival, rng)
+    return placed
+
+
+def simulate_density(params: PatchParameters, chunks: int = 2_000_000, survival: float = 1.0, band_chunks: int = 200_000, temp_band: float = 5, rain_band: float = 50, seed: Optional[int] = 0) -> DensityReport:
+    """
+    Monte Carlo estimate of wild crop density for a patch feature. `survival` is the chance a try lands on a replaceable block the crop can survive on, which depends on terrain and is not simulated.
+    Climate gates are evaluated at the patch origin. Forest and fuzzy climate gates are not modeled.
+    """
+    rng = np.random.default_rng(seed)
+    patches = simulate_patches(params, chunks, survival, rng)
+    rolls = rng.random(chunks) < 1 / params.rarity
+    gated = np.zeros(chunks, dtype=np.int64)
+    gated[rolls] = simulate_patches(params, int(rolls.sum()), survival, rng)
+    bands = []
+    for temp in np.arange(*TEMPERATURE_RANGE, temp_band):
+        for rain in np.arange(*RAINFALL_RANGE, rain_band):
+            temps = rng.uniform(temp, temp + temp_band, band_chunks)
+            rains = rng.uniform(rain, rain + rain_band, band_chunks)
+            bands.append(BandEstimate((float(temp), float(temp + temp_band)), (float(rain), float(rain + rain_band)), estimate(simulate_chunks(params, temps, rains, survival, rng))))
+    return DensityReport(chunks, estimate(rolls.astype(np.float64)), estimate(patches), estimate(gated), bands)
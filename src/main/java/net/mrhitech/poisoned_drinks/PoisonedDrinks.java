@@ -27,6 +27,8 @@ import net.mrhitech.poisoned_drinks.common.block.PoisonedDrinksBlocks;
 import net.mrhitech.poisoned_drinks.common.block.crop.Crop;
 import net.mrhitech.poisoned_drinks.common.fluids.PoisonedDrinksFluids;
 import net.mrhitech.poisoned_drinks.common.item.PoisonedDrinksItems;
+import net.mrhitech.poisoned_drinks.common.recipes.DisabledRecipes;
+import net.mrhitech.poisoned_drinks.common.recipes.PoisonedDrinksRecipeSerializers;
 import net.mrhitech.poisoned_drinks.common.recipes.modifiers.PoisonedBeveragesItemStackModifiers;
 import org.slf4j.Logger;
 
@@ -47,6 +49,8 @@ public class PoisonedDrinks
         PoisonedDrinksBlocks.register(modEventBus);
         PoisonedDrinksItems.register(modEventBus);
         PoisonedDrinksFluids.register(modEventBus);
+        PoisonedDrinksRecipeSerializers.register(modEventBus);
+        ResourceBundles.register(modEventBus);
         PoisonedBeveragesItemStackModifiers.registerItemStackModifierTypes();
 
         // Register the commonSetup method for modloading
@@ -58,6 +62,7 @@ public class PoisonedDrinks
         
         // Register ourselves for server and other game events we are interested in
         MinecraftForge.EVENT_BUS.register(this);
+        MinecraftForge.EVENT_BUS.addListener(DisabledRecipes::onAddReloadListeners);
 
         // Register the item to a creative tab
         modEventBus.addListener(this::addCreative);
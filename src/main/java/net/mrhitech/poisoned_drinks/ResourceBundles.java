@@ -0,0 +1,166 @@
+package net.mrhitech.poisoned_drinks;
+
+import com.google.gson.Gson;
+import com.google.gson.JsonElement;
+import com.google.gson.JsonObject;
+import com.mojang.logging.LogUtils;
+import net.minecraft.SharedConstants;
+import net.minecraft.network.chat.Component;
+import net.minecraft.resources.ResourceLocation;
+import net.minecraft.server.packs.PackResources;
+import net.minecraft.server.packs.PackType;
+import net.minecraft.server.packs.metadata.MetadataSectionSerializer;
+import net.minecraft.server.packs.metadata.pack.PackMetadataSection;
+import net.minecraft.server.packs.repository.Pack;
+import net.minecraft.server.packs.repository.PackSource;
+import net.minecraft.server.packs.resources.IoSupplier;
+import net.minecraft.util.GsonHelper;
+import net.minecraftforge.event.AddPackFindersEvent;
+import net.minecraftforge.eventbus.api.IEventBus;
+import org.jetbrains.annotations.Nullable;
+import org.slf4j.Logger;
+
+import java.io.ByteArrayInputStream;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.io.Reader;
+import java.nio.charset.StandardCharsets;
+import java.util.HashMap;
+import java.util.Map;
+import java.util.Set;
+import java.util.stream.Collectors;
+
+/**
+ * Expands the resource bundles written by the generator in bundle mode ({@code bundles/<pack type>/<registry>.json}) into a built-in pack.
+ * Each bundle maps {@code namespace:path} of a resource to its json content. When no bundles were generated, no pack is added.
+ */
+public class ResourceBundles {
+
+    private static final Logger LOGGER = LogUtils.getLogger();
+    private static final Gson GSON = new Gson();
+    private static final String ROOT = "/bundles/";
+    private static final String PACK_ID = PoisonedDrinks.MOD_ID + "_bundles";
+    private static final String COMMENT = "__comment__";
+
+    public static void register(IEventBus bus) {
+        bus.addListener(ResourceBundles::addPackFinders);
+    }
+
+    private static void addPackFinders(AddPackFindersEvent event) {
+        final PackType type = event.getPackType();
+        final Map<ResourceLocation, byte[]> resources = load(type);
+        if (resources.isEmpty()) {
+            return;
+        }
+        final Pack pack = Pack.readMetaAndCreate(PACK_ID, Component.literal("Poisoned Drinks Resources"), true, id -> new BundlePackResources(id, type, resources), type, Pack.Position.TOP, PackSource.BUILT_IN);
+        if (pack != null) {
+            event.addRepositorySource(consumer -> consumer.accept(pack));
+        }
+    }
+
+    private static Map<ResourceLocation, byte[]> load(PackType type) {
+        final Map<ResourceLocation, byte[]> resources = new HashMap<>();
+        final JsonObject manifest = read("manifest.json");
+        if (manifest == null) {
+            return resources;
+        }
+        for (JsonElement name : GsonHelper.getAsJsonArray(manifest, type.getDirectory())) {
+            final JsonObject bundle = read(type.getDirectory() + "/" + name.getAsString() + ".json");
+            if (bundle == null) {
+                LOGGER.error("Missing resource bundle {}/{}", type.getDirectory(), name.getAsString());
+                continue;
+            }
+            for (Map.Entry<String, JsonElement> entry : bundle.entrySet()) {
+                if (!entry.getKey().equals(COMMENT)) {
+                    resources.put(new ResourceLocation(entry.getKey()), GSON.toJson(entry.getValue()).getBytes(StandardCharsets.UTF_8));
+                }
+            }
+        }
+        LOGGER.debug("Expanded {} resources from {} bundles", resources.size(), type.getDirectory());
+        return resources;
+    }
+
+    @Nullable
+    private static JsonObject read(String path) {
+        final InputStream stream = ResourceBundles.class.getResourceAsStream(ROOT + path);
+        if (stream == null) {
+            return null;
+        }
+        try (Reader reader = new InputStreamReader(stream, StandardCharsets.UTF_8)) {
+            return GsonHelper.parse(reader);
+        } catch (IOException e) {
+            LOGGER.error("Failed to read resource bundle {}", path, e);
+            return null;
+        }
+    }
+
+    private static class BundlePackResources implements PackResources {
+
+        private final String id;
+        private final PackType type;
+        private final Map<ResourceLocation, byte[]> resources;
+        private final Set<String> namespaces;
+
+        BundlePackResources(String id, PackType type, Map<ResourceLocation, byte[]> resources) {
+            this.id = id;
+            this.type = type;
+            this.resources = resources;
+            this.namespaces = resources.keySet().stream().map(ResourceLocation::getNamespace).collect(Collectors.toUnmodifiableSet());
+        }
+
+        @Nullable
+        @Override
+        public IoSupplier<InputStream> getRootResource(String... elements) {
+            return null;
+        }
+
+        @Nullable
+        @Override
+        public IoSupplier<InputStream> getResource(PackType type, ResourceLocation location) {
+            final byte[] data = type == this.type ? resources.get(location) : null;
+            return data == null ? null : () -> new ByteArrayInputStream(data);
+        }
+
+        @Override
+        public void listResources(PackType type, String namespace, String path, ResourceOutput output) {
+            if (type != this.type) {
+                return;
+            }
+            final String prefix = path + "/";
+            resources.forEach((location, data) -> {
+                if (location.getNamespace().equals(namespace) && location.getPath().startsWith(prefix)) {
+                    output.accept(location, () -> new ByteArrayInputStream(data));
+                }
+            });
+        }
+
+        @Override
+        public Set<String> getNamespaces(PackType type) {
+            return type == this.type ? namespaces : Set.of();
+        }
+
+        @Nullable
+        @Override
+        @SuppressWarnings("unchecked")
+        public <T> T getMetadataSection(MetadataSectionSerializer<T> serializer) {
+            if (serializer == PackMetadataSection.TYPE) {
+                return (T) new PackMetadataSection(Component.literal("Poisoned Drinks Resources"), SharedConstants.getCurrentVersion().getPackVersion(type));
+            }
+            return null;
+        }
+
+        @Override
+        public String packId() {
+            return id;
+        }
+
+        @Override
+        public boolean isBuiltin() {
+            return true;
+        }
+
+        @Override
+        public void close() {}
+    }
+}
@@ -0,0 +1,85 @@
+package net.mrhitech.poisoned_drinks.common.recipes;
+
+import com.google.gson.JsonObject;
+import net.dries007.tfc.common.blockentities.BarrelBlockEntity;
+import net.dries007.tfc.common.recipes.BarrelRecipe;
+import net.dries007.tfc.common.recipes.InstantBarrelRecipe;
+import net.minecraft.network.FriendlyByteBuf;
+import net.minecraft.resources.ResourceLocation;
+import net.minecraft.world.item.ItemStack;
+import net.minecraft.world.item.crafting.RecipeSerializer;
+import net.minecraft.world.level.Level;
+import net.minecraft.world.level.material.Fluid;
+import net.minecraftforge.fluids.FluidStack;
+import net.minecraftforge.fluids.capability.IFluidHandler;
+import org.jetbrains.annotations.Nullable;
+
+import java.util.Map;
+
+/**
+ * A single instant barrel recipe which poisons every fluid in {@code fluids}.
+ * The {@code input_fluid} is a fluid tag, so the recipe reads like any other instant barrel recipe, but the output fluid is a map lookup on the barrel's fluid.
+ * As with TFC's instant recipes, one input item and {@code input_fluid.amount} mB of fluid are used per batch.
+ */
+public class BarrelPoisoningRecipe extends InstantBarrelRecipe {
+    
+    private final Map<Fluid, Fluid> fluids;
+    
+    public BarrelPoisoningRecipe(ResourceLocation id, Builder builder, Map<Fluid, Fluid> fluids) {
+        super(id, builder);
+        this.fluids = fluids;
+    }
+    
+    @Override
+    public boolean matches(BarrelBlockEntity.BarrelInventory container, @Nullable Level level) {
+        final FluidStack contained = container.getFluidInTank(0);
+        final ItemStack stack = container.getStackInSlot(BarrelBlockEntity.SLOT_ITEM);
+        return fluids.containsKey(contained.getFluid())
+                && getInputFluid().test(contained)
+                && getInputItem().test(stack);
+    }
+    
+    @Override
+    public void assembleOutputs(BarrelBlockEntity.BarrelInventory inventory) {
+        inventory.whileMutable(() -> {
+            final FluidStack contained = inventory.getFluidInTank(0);
+            final Fluid poisoned = fluids.get(contained.getFluid());
+            final ItemStack stack = inventory.getStackInSlot(BarrelBlockEntity.SLOT_ITEM);
+            final int itemsPerBatch = Math.max(1, getInputItem().count());
+            final int fluidPerBatch = getInputFluid().amount();
+            final int batches = Math.min(stack.getCount() / itemsPerBatch, contained.getAmount() / fluidPerBatch);
+            if (poisoned == null || batches <= 0) {
+                return;
+            }
+            
+            stack.shrink(batches * itemsPerBatch);
+            inventory.drain(Integer.MAX_VALUE, IFluidHandler.FluidAction.EXECUTE);
+            inventory.fill(new FluidStack(poisoned, batches * fluidPerBatch), IFluidHandler.FluidAction.EXECUTE);
+        });
+    }
+    
+    @Override
+    public RecipeSerializer<?> getSerializer() {
+        return PoisonedDrinksRecipeSerializers.BARREL_POISONING.get();
+    }
+    
+    public static class Serializer implements RecipeSerializer<BarrelPoisoningRecipe> {
+        
+        @Override
+        public BarrelPoisoningRecipe fromJson(ResourceLocation id, JsonObject json) {
+            return new BarrelPoisoningRecipe(id, BarrelRecipe.Builder.fromJson(json), FluidMappings.fromJson(json, "fluids"));
+        }
+        
+        @Override
+        public BarrelPoisoningRecipe fromNetwork(ResourceLocation id, FriendlyByteBuf buffer) {
+            final Builder builder = BarrelRecipe.Builder.fromNetwork(buffer);
+            return new BarrelPoisoningRecipe(id, builder, FluidMappings.fromNetwork(buffer));
+        }
+        
+        @Override
+        public void toNetwork(FriendlyByteBuf buffer, BarrelPoisoningRecipe recipe) {
+            BarrelRecipe.Builder.toNetwork(recipe, buffer);
+            FluidMappings.toNetwork(buffer, recipe.fluids);
+        }
+    }
+}
@@ -0,0 +1,57 @@
+package net.mrhitech.poisoned_drinks.common.recipes;
+
+import com.google.gson.Gson;
+import com.google.gson.JsonElement;
+import com.mojang.logging.LogUtils;
+import net.minecraft.resources.ResourceLocation;
+import net.minecraft.server.packs.resources.ResourceManager;
+import net.minecraft.server.packs.resources.SimpleJsonResourceReloadListener;
+import net.minecraft.util.GsonHelper;
+import net.minecraft.util.profiling.ProfilerFiller;
+import net.minecraft.world.item.crafting.Recipe;
+import net.minecraft.world.item.crafting.RecipeManager;
+import net.minecraftforge.event.AddReloadListenerEvent;
+import org.slf4j.Logger;
+
+import java.util.HashSet;
+import java.util.List;
+import java.util.Map;
+import java.util.Set;
+
+/**
+ * Removes every recipe listed in a {@code disabled_recipes/*.json} filter file from the recipe manager, once recipes have been loaded.
+ * This replaces one {@code forge:false} override file per disabled recipe.
+ */
+public class DisabledRecipes extends SimpleJsonResourceReloadListener {
+
+    private static final Logger LOGGER = LogUtils.getLogger();
+    private static final Gson GSON = new Gson();
+
+    public static void onAddReloadListeners(AddReloadListenerEvent event) {
+        event.addListener(new DisabledRecipes(event.getServerResources().getRecipeManager()));
+    }
+
+    private final RecipeManager recipeManager;
+
+    public DisabledRecipes(RecipeManager recipeManager) {
+        super(GSON, "disabled_recipes");
+        this.recipeManager = recipeManager;
+    }
+
+    @Override
+    protected void apply(Map<ResourceLocation, JsonElement> files, ResourceManager resourceManager, ProfilerFiller profiler) {
+        final Set<ResourceLocation> disabled = new HashSet<>();
+        files.forEach((file, json) -> {
+            for (JsonElement id : GsonHelper.getAsJsonArray(GsonHelper.convertToJsonObject(json, file.toString()), "recipes")) {
+                disabled.add(new ResourceLocation(id.getAsString()));
+            }
+        });
+        if (disabled.isEmpty()) {
+            return;
+        }
+
+        final List<Recipe<?>> recipes = recipeManager.getRecipes().stream().filter(recipe -> !disabled.contains(recipe.getId())).toList();
+        LOGGER.info("Disabled {} recipes from {} filter files", recipeManager.getRecipes().size() - recipes.size(), files.size());
+        recipeManager.replaceRecipes(recipes);
+    }
+}
@@ -0,0 +1,53 @@
+package net.mrhitech.poisoned_drinks.common.recipes;
+
+import com.google.gson.JsonElement;
+import com.google.gson.JsonObject;
+import com.google.gson.JsonParseException;
+import net.minecraft.network.FriendlyByteBuf;
+import net.minecraft.resources.ResourceLocation;
+import net.minecraft.util.GsonHelper;
+import net.minecraft.world.level.material.Fluid;
+import net.minecraftforge.registries.ForgeRegistries;
+
+import java.util.HashMap;
+import java.util.Map;
+
+/**
+ * Reads and writes the source fluid -> poisoned fluid tables used by the poisoning recipes.
+ */
+public final class FluidMappings {
+    
+    public static Map<Fluid, Fluid> fromJson(JsonObject json, String key) {
+        final Map<Fluid, Fluid> fluids = new HashMap<>();
+        for (Map.Entry<String, JsonElement> entry : GsonHelper.getAsJsonObject(json, key).entrySet()) {
+            final ResourceLocation input = new ResourceLocation(entry.getKey());
+            final ResourceLocation output = new ResourceLocation(GsonHelper.convertToString(entry.getValue(), entry.getKey()));
+            if (!ForgeRegistries.FLUIDS.containsKey(output)) {
+                throw new JsonParseException("Unknown poisoned fluid: " + output);
+            }
+            // Fluids from mods which are not loaded are skipped, rather than failing the whole recipe
+            if (ForgeRegistries.FLUIDS.containsKey(input)) {
+                fluids.put(ForgeRegistries.FLUIDS.getValue(input), ForgeRegistries.FLUIDS.getValue(output));
+            }
+        }
+        return fluids;
+    }
+    
+    public static Map<Fluid, Fluid> fromNetwork(FriendlyByteBuf buffer) {
+        return buffer.readMap(HashMap::new, FluidMappings::readFluid, FluidMappings::readFluid);
+    }
+    
+    public static void toNetwork(FriendlyByteBuf buffer, Map<Fluid, Fluid> fluids) {
+        buffer.writeMap(fluids, FluidMappings::writeFluid, FluidMappings::writeFluid);
+    }
+    
+    private static Fluid readFluid(FriendlyByteBuf buffer) {
+        return ForgeRegistries.FLUIDS.getValue(buffer.readResourceLocation());
+    }
+    
+    private static void writeFluid(FriendlyByteBuf buffer, Fluid fluid) {
+        buffer.writeResourceLocation(ForgeRegistries.FLUIDS.getKey(fluid));
+    }
+    
+    private FluidMappings() {}
+}
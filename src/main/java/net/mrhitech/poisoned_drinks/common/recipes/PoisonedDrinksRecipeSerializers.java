@@ -0,0 +1,19 @@
+package net.mrhitech.poisoned_drinks.common.recipes;
+
+import net.minecraft.world.item.crafting.RecipeSerializer;
+import net.minecraftforge.eventbus.api.IEventBus;
+import net.minecraftforge.registries.DeferredRegister;
+import net.minecraftforge.registries.ForgeRegistries;
+import net.minecraftforge.registries.RegistryObject;
+import net.mrhitech.poisoned_drinks.PoisonedDrinks;
+
+public class PoisonedDrinksRecipeSerializers {
+    public static final DeferredRegister<RecipeSerializer<?>> RECIPE_SERIALIZERS = DeferredRegister.create(ForgeRegistries.RECIPE_SERIALIZERS, PoisonedDrinks.MOD_ID);
+    
+    public static final RegistryObject<PoisoningRecipe.Serializer> POISONING = RECIPE_SERIALIZERS.register("poisoning", PoisoningRecipe.Serializer::new);
+    public static final RegistryObject<BarrelPoisoningRecipe.Serializer> BARREL_POISONING = RECIPE_SERIALIZERS.register("barrel_poisoning", BarrelPoisoningRecipe.Serializer::new);
+    
+    public static void register(IEventBus bus) {
+        RECIPE_SERIALIZERS.register(bus);
+    }
+}
@@ -0,0 +1,140 @@
+package net.mrhitech.poisoned_drinks.common.recipes;
+
+import com.google.gson.JsonObject;
+import net.minecraft.core.NonNullList;
+import net.minecraft.core.RegistryAccess;
+import net.minecraft.network.FriendlyByteBuf;
+import net.minecraft.resources.ResourceLocation;
+import net.minecraft.util.GsonHelper;
+import net.minecraft.world.inventory.CraftingContainer;
+import net.minecraft.world.item.ItemStack;
+import net.minecraft.world.item.crafting.CraftingBookCategory;
+import net.minecraft.world.item.crafting.CustomRecipe;
+import net.minecraft.world.item.crafting.Ingredient;
+import net.minecraft.world.item.crafting.RecipeSerializer;
+import net.minecraft.world.level.Level;
+import net.minecraft.world.level.material.Fluid;
+import net.minecraftforge.fluids.FluidStack;
+import net.minecraftforge.fluids.FluidUtil;
+import net.mrhitech.poisoned_drinks.common.recipes.modifiers.OutputFluidItemIngredientModifier;
+import org.jetbrains.annotations.Nullable;
+
+import java.util.Map;
+
+/**
+ * A single crafting recipe which poisons any fluid container whose fluid is in {@code fluids}.
+ * Replaces one shapeless recipe per (fluid, number of poisons), so matching is a single pass over the grid plus a map lookup.
+ */
+public class PoisoningRecipe extends CustomRecipe {
+    
+    private final Ingredient poison;
+    private final Map<Fluid, Fluid> fluids;
+    private final int minAmount;
+    private final int amountPerPoison;
+    private final int maxPoisons;
+    
+    public PoisoningRecipe(ResourceLocation id, Ingredient poison, Map<Fluid, Fluid> fluids, int minAmount, int amountPerPoison, int maxPoisons) {
+        super(id, CraftingBookCategory.MISC);
+        this.poison = poison;
+        this.fluids = fluids;
+        this.minAmount = minAmount;
+        this.amountPerPoison = amountPerPoison;
+        this.maxPoisons = maxPoisons;
+    }
+    
+    @Override
+    public boolean matches(CraftingContainer container, Level level) {
+        return findMatch(container) != null;
+    }
+    
+    @Override
+    public ItemStack assemble(CraftingContainer container, RegistryAccess access) {
+        final Match match = findMatch(container);
+        if (match == null) {
+            return ItemStack.EMPTY;
+        }
+        final ItemStack output = new OutputFluidItemIngredientModifier(new FluidStack(match.poisoned(), match.poisons() * amountPerPoison)).apply(ItemStack.EMPTY, match.fluidItem());
+        output.setCount(1);
+        return output;
+    }
+    
+    @Nullable
+    private Match findMatch(CraftingContainer container) {
+        ItemStack fluidItem = ItemStack.EMPTY;
+        int poisons = 0;
+        for (int i = 0; i < container.getContainerSize(); i++) {
+            final ItemStack stack = container.getItem(i);
+            if (stack.isEmpty()) {
+                continue;
+            }
+            if (poison.test(stack)) {
+                poisons++;
+            } else if (fluidItem.isEmpty()) {
+                fluidItem = stack;
+            } else {
+                return null;
+            }
+        }
+        
+        if (fluidItem.isEmpty() || poisons < 1 || poisons > maxPoisons) {
+            return null;
+        }
+        
+        final FluidStack contained = FluidUtil.getFluidContained(fluidItem).orElse(FluidStack.EMPTY);
+        final Fluid poisoned = fluids.get(contained.getFluid());
+        if (poisoned == null || contained.getAmount() < minAmount) {
+            return null;
+        }
+        return new Match(fluidItem, poisoned, poisons);
+    }
+    
+    @Override
+    public NonNullList<ItemStack> getRemainingItems(CraftingContainer container) {
+        // The fluid container is returned as the result, and poisons are consumed
+        return NonNullList.withSize(container.getContainerSize(), ItemStack.EMPTY);
+    }
+    
+    @Override
+    public boolean canCraftInDimensions(int width, int height) {
+        return width * height >= 2;
+    }
+    
+    @Override
+    public RecipeSerializer<?> getSerializer() {
+        return PoisonedDrinksRecipeSerializers.POISONING.get();
+    }
+    
+    public static class Serializer implements RecipeSerializer<PoisoningRecipe> {
+        
+        @Override
+        public PoisoningRecipe fromJson(ResourceLocation id, JsonObject json) {
+            final Ingredient poison = Ingredient.fromJson(json.get("poison"));
+            final Map<Fluid, Fluid> fluids = FluidMappings.fromJson(json, "fluids");
+            final int minAmount = GsonHelper.getAsInt(json, "min_amount", 1);
+            final int amountPerPoison = GsonHelper.getAsInt(json, "amount_per_poison");
+            final int maxPoisons = GsonHelper.getAsInt(json, "max_poisons", 8);
+            return new PoisoningRecipe(id, poison, fluids, minAmount, amountPerPoison, maxPoisons);
+        }
+        
+        @Override
+        public PoisoningRecipe fromNetwork(ResourceLocation id, FriendlyByteBuf buffer) {
+            final Ingredient poison = Ingredient.fromNetwork(buffer);
+            final Map<Fluid, Fluid> fluids = FluidMappings.fromNetwork(buffer);
+            final int minAmount = buffer.readVarInt();
+            final int amountPerPoison = buffer.readVarInt();
+            final int maxPoisons = buffer.readVarInt();
+            return new PoisoningRecipe(id, poison, fluids, minAmount, amountPerPoison, maxPoisons);
+        }
+        
+        @Override
+        public void toNetwork(FriendlyByteBuf buffer, PoisoningRecipe recipe) {
+            recipe.poison.toNetwork(buffer);
+            FluidMappings.toNetwork(buffer, recipe.fluids);
+            buffer.writeVarInt(recipe.minAmount);
+            buffer.writeVarInt(recipe.amountPerPoison);
+            buffer.writeVarInt(recipe.maxPoisons);
+        }
+    }
+    
+    private record Match(ItemStack fluidItem, Fluid poisoned, int poisons) {}
+}